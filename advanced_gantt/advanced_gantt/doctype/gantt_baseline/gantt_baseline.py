@@ -0,0 +1,13 @@
+import frappe
+from frappe.model.document import Document
+
+class GanttBaseline(Document):
+    def validate(self):
+        """Validate Gantt Baseline"""
+        if not self.is_new() and self.has_value_changed("encoded_data"):
+            frappe.throw("Baseline snapshots cannot be modified once saved")
+    
+    def on_trash(self):
+        """Prevent breaking the delta chain of later baselines"""
+        if frappe.db.exists("Gantt Baseline", {"previous_baseline": self.name}):
+            frappe.throw("Cannot delete a baseline that later baselines are based on")
@@ -0,0 +1,372 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, nowdate, add_days, cint, flt
+import base64
+import json
+import zlib
+
+
+# Bump when the snapshot layout changes
+BASELINE_FORMAT_VERSION = 1
+
+# Store a full snapshot every N baselines so decoding never walks a long chain
+KEYFRAME_INTERVAL = 20
+
+# Day offset used for tasks without a date
+MISSING_DATE = -(2 ** 31)
+
+VALUE_COLUMNS = ("start", "finish", "progress")
+
+
+@frappe.whitelist()
+def create_baseline(project, baseline_name=None):
+    """Save the current task dates and progress of a project as a baseline"""
+    try:
+        if not frappe.has_permission("Gantt Baseline", "create"):
+            frappe.throw(_("No permission to create baselines"))
+
+        previous = get_latest_baseline(project)
+
+        if previous and cint(previous.chain_depth) + 1 < KEYFRAME_INTERVAL:
+            epoch = getdate(previous.epoch)
+            previous_columns = load_baseline_columns(previous.name)
+        else:
+            epoch = None
+            previous_columns = None
+
+        tasks = get_project_tasks(project)
+        if epoch is None:
+            epoch = get_snapshot_epoch(tasks)
+
+        columns = build_task_columns(tasks, epoch)
+
+        if previous_columns is not None:
+            delta = diff_columns(previous_columns, columns)
+            snapshot = {"v": BASELINE_FORMAT_VERSION, "type": "delta", **delta}
+            chain_depth = cint(previous.chain_depth) + 1
+            changed_count = (
+                len(delta["changed"]["pos"]) + len(delta["added"]["ids"]) + len(delta["removed"])
+            )
+        else:
+            snapshot = {"v": BASELINE_FORMAT_VERSION, "type": "full", **columns}
+            chain_depth = 0
+            changed_count = len(columns["ids"])
+
+        baseline_doc = frappe.get_doc({
+            "doctype": "Gantt Baseline",
+            "baseline_name": baseline_name or _("Baseline {0}").format(nowdate()),
+            "project": project,
+            "epoch": epoch,
+            "previous_baseline": previous.name if previous else None,
+            "is_keyframe": 1 if snapshot["type"] == "full" else 0,
+            "chain_depth": chain_depth,
+            "task_count": len(columns["ids"]),
+            "changed_count": changed_count,
+            "encoded_data": encode_snapshot(snapshot)
+        })
+        baseline_doc.insert()
+
+        return {
+            "status": "success",
+            "baseline": baseline_doc.name,
+            "task_count": baseline_doc.task_count,
+            "changed_count": baseline_doc.changed_count,
+            "message": _("Baseline created successfully")
+        }
+
+    except Exception as e:
+        frappe.log_error(f"Error creating baseline: {str(e)}")
+        frappe.throw(_("Error creating baseline: {0}").format(str(e)))
+
+
+@frappe.whitelist()
+def get_baseline_variance(baseline):
+    """Get per-task start/finish variance (in days) of the current plan against a baseline"""
+    try:
+        if not frappe.has_permission("Gantt Baseline", "read"):
+            frappe.throw(_("No permission to read baselines"))
+
+        baseline_doc = frappe.db.get_value(
+            "Gantt Baseline", baseline, ["name", "project", "epoch"], as_dict=True
+        )
+        if not baseline_doc:
+            frappe.throw(_("Baseline {0} not found").format(baseline))
+
+        epoch = getdate(baseline_doc.epoch)
+        baseline_columns = load_baseline_columns(baseline_doc.name)
+        current_columns = build_task_columns(get_project_tasks(baseline_doc.project), epoch)
+
+        return {
+            "baseline": baseline_doc.name,
+            "project": baseline_doc.project,
+            "tasks": compute_variance(baseline_columns, current_columns, epoch)
+        }
+
+    except Exception as e:
+        frappe.log_error(f"Error computing baseline variance: {str(e)}")
+        frappe.throw(_("Error computing baseline variance: {0}").format(str(e)))
+
+
+def get_task_baselines(project):
+    """Get the Bryntum `baselines` field for every task of a project, oldest baseline first"""
+    baselines = frappe.get_all(
+        "Gantt Baseline",
+        filters={"project": project},
+        fields=["name", "epoch"],
+        order_by="creation asc"
+    )
+
+    task_baselines = {}
+    for index, baseline in enumerate(baselines):
+        epoch = getdate(baseline.epoch)
+        columns = load_baseline_columns(baseline.name)
+
+        for position, task_id in enumerate(columns["ids"]):
+            # Bryntum matches baselines by position, so pad tasks missing from earlier ones
+            entries = task_baselines.setdefault(task_id, [{} for _i in range(index)])
+            entries.append({
+                "startDate": offset_to_date(columns["start"][position], epoch),
+                "endDate": offset_to_date(columns["finish"][position], epoch),
+                "percentDone": columns["progress"][position] / 100
+            })
+
+        for entries in task_baselines.values():
+            if len(entries) <= index:
+                entries.append({})
+
+    return task_baselines
+
+
+def get_latest_baseline(project):
+    """Get the most recent baseline of a project"""
+    baselines = frappe.get_all(
+        "Gantt Baseline",
+        filters={"project": project},
+        fields=["name", "epoch", "chain_depth"],
+        order_by="creation desc",
+        limit=1
+    )
+
+    return baselines[0] if baselines else None
+
+
+def get_project_tasks(project):
+    """Get the scheduling fields of all tasks of a project"""
+    return frappe.get_all(
+        "Task",
+        filters={"project": project},
+        fields=["name", "exp_start_date", "exp_end_date", "progress"]
+    )
+
+
+def load_baseline_columns(baseline):
+    """Decode a baseline into sorted columns, replaying deltas from the last full snapshot"""
+    cache_key = f"gantt_baseline::{baseline}"
+    columns = frappe.cache().get_value(cache_key)
+    if columns:
+        return columns
+
+    # Walk back to the nearest full snapshot
+    chain = []
+    name = baseline
+    while name:
+        row = frappe.db.get_value(
+            "Gantt Baseline", name, ["previous_baseline", "encoded_data"], as_dict=True
+        )
+        snapshot = decode_snapshot(row.encoded_data)
+        chain.append(snapshot)
+        if snapshot["type"] == "full":
+            break
+        name = row.previous_baseline
+
+    if chain[-1]["type"] != "full":
+        frappe.throw(_("Baseline {0} has no full snapshot to start from").format(baseline))
+
+    full = chain.pop()
+    columns = {"ids": full["ids"], **{column: full[column] for column in VALUE_COLUMNS}}
+    while chain:
+        columns = apply_delta(columns, chain.pop())
+
+    # Baselines are immutable, so the decoded columns can be cached
+    frappe.cache().set_value(cache_key, columns, expires_in_sec=3600)
+
+    return columns
+
+
+def get_snapshot_epoch(tasks):
+    """Use the earliest task start as the reference date of a full snapshot"""
+    start_dates = [getdate(task.exp_start_date) for task in tasks if task.exp_start_date]
+    return min(start_dates) if start_dates else getdate(nowdate())
+
+
+def build_task_columns(tasks, epoch):
+    """Encode tasks as columns sorted by task id, with dates as integer day offsets from epoch"""
+    tasks = sorted(tasks, key=lambda task: task.name)
+
+    return {
+        "ids": [task.name for task in tasks],
+        "start": [date_to_offset(task.exp_start_date, epoch) for task in tasks],
+        "finish": [date_to_offset(task.exp_end_date, epoch) for task in tasks],
+        # Progress is stored in hundredths of a percent
+        "progress": [int(round(flt(task.progress) * 100)) for task in tasks]
+    }
+
+
+def date_to_offset(value, epoch):
+    """Convert a date to a day offset from epoch"""
+    if not value:
+        return MISSING_DATE
+    return (getdate(value) - epoch).days
+
+
+def offset_to_date(offset, epoch):
+    """Convert a day offset from epoch back to a date"""
+    if offset == MISSING_DATE:
+        return None
+    return add_days(epoch, offset)
+
+
+def diff_columns(previous, current):
+    """
+    Delta-encode current columns against previous ones in a single merge pass.
+    Positions refer to the previous id list and are gap encoded; unchanged
+    tasks are not stored at all.
+    """
+    removed = []
+    added = {"ids": [], **{column: [] for column in VALUE_COLUMNS}}
+    changed = {"pos": [], **{column: [] for column in VALUE_COLUMNS}}
+
+    previous_ids = previous["ids"]
+    current_ids = current["ids"]
+    i = j = 0
+
+    while i < len(previous_ids) or j < len(current_ids):
+        if j >= len(current_ids) or (i < len(previous_ids) and previous_ids[i] < current_ids[j]):
+            removed.append(i)
+            i += 1
+        elif i >= len(previous_ids) or current_ids[j] < previous_ids[i]:
+            added["ids"].append(current_ids[j])
+            for column in VALUE_COLUMNS:
+                added[column].append(current[column][j])
+            j += 1
+        else:
+            deltas = [current[column][j] - previous[column][i] for column in VALUE_COLUMNS]
+            if any(deltas):
+                changed["pos"].append(i)
+                for column, delta in zip(VALUE_COLUMNS, deltas):
+                    changed[column].append(delta)
+            i += 1
+            j += 1
+
+    changed["pos"] = gap_encode(changed["pos"])
+
+    return {"removed": gap_encode(removed), "added": added, "changed": changed}
+
+
+def apply_delta(previous, delta):
+    """Rebuild columns from the previous columns and a delta produced by diff_columns"""
+    values = {column: list(previous[column]) for column in VALUE_COLUMNS}
+
+    changed = delta["changed"]
+    for index, position in enumerate(gap_decode(changed["pos"])):
+        for column in VALUE_COLUMNS:
+            values[column][position] += changed[column][index]
+
+    removed = set(gap_decode(delta["removed"]))
+    kept = [i for i in range(len(previous["ids"])) if i not in removed]
+    added = delta["added"]
+
+    # Merge the kept and added rows, both already sorted by id
+    columns = {"ids": [], **{column: [] for column in VALUE_COLUMNS}}
+    i = j = 0
+    while i < len(kept) or j < len(added["ids"]):
+        if j >= len(added["ids"]) or (i < len(kept) and previous["ids"][kept[i]] < added["ids"][j]):
+            columns["ids"].append(previous["ids"][kept[i]])
+            for column in VALUE_COLUMNS:
+                columns[column].append(values[column][kept[i]])
+            i += 1
+        else:
+            columns["ids"].append(added["ids"][j])
+            for column in VALUE_COLUMNS:
+                columns[column].append(added[column][j])
+            j += 1
+
+    return columns
+
+
+def compute_variance(baseline, current, epoch):
+    """Compare baseline and current columns (same epoch) in one merge pass over the sorted ids"""
+    variance = []
+    baseline_ids = baseline["ids"]
+    current_ids = current["ids"]
+    i = j = 0
+
+    while i < len(baseline_ids) or j < len(current_ids):
+        if j >= len(current_ids) or (i < len(baseline_ids) and baseline_ids[i] < current_ids[j]):
+            task_id, b, c, status = baseline_ids[i], i, None, "removed"
+            i += 1
+        elif i >= len(baseline_ids) or current_ids[j] < baseline_ids[i]:
+            task_id, b, c, status = current_ids[j], None, j, "added"
+            j += 1
+        else:
+            task_id, b, c, status = current_ids[j], i, j, "matched"
+            i += 1
+            j += 1
+
+        baseline_start = baseline["start"][b] if b is not None else MISSING_DATE
+        baseline_finish = baseline["finish"][b] if b is not None else MISSING_DATE
+        current_start = current["start"][c] if c is not None else MISSING_DATE
+        current_finish = current["finish"][c] if c is not None else MISSING_DATE
+
+        variance.append({
+            "task": task_id,
+            "status": status,
+            "baselineStart": offset_to_date(baseline_start, epoch),
+            "baselineEnd": offset_to_date(baseline_finish, epoch),
+            "currentStart": offset_to_date(current_start, epoch),
+            "currentEnd": offset_to_date(current_finish, epoch),
+            "startVariance": offset_difference(current_start, baseline_start),
+            "finishVariance": offset_difference(current_finish, baseline_finish),
+            "progressVariance": (
+                (current["progress"][c] - baseline["progress"][b]) / 100
+                if status == "matched" else None
+            )
+        })
+
+    return variance
+
+
+def offset_difference(current, baseline):
+    """Difference in days between two offsets, or None if either date is missing"""
+    if current == MISSING_DATE or baseline == MISSING_DATE:
+        return None
+    return current - baseline
+
+
+def gap_encode(positions):
+    """Store ascending positions as differences from the previous one"""
+    return [position - previous for previous, position in zip([0] + positions, positions)]
+
+
+def gap_decode(gaps):
+    """Inverse of gap_encode"""
+    positions = []
+    total = 0
+    for gap in gaps:
+        total += gap
+        positions.append(total)
+    return positions
+
+
+def encode_snapshot(snapshot):
+    """Serialize a snapshot as compressed, base64 encoded JSON"""
+    payload = json.dumps(snapshot, separators=(",", ":")).encode()
+    return base64.b64encode(zlib.compress(payload)).decode()
+
+
+def decode_snapshot(encoded_data):
+    """Inverse of encode_snapshot"""
+    snapshot = json.loads(zlib.decompress(base64.b64decode(encoded_data)))
+    if snapshot.get("v") != BASELINE_FORMAT_VERSION:
+        frappe.throw(_("Unsupported baseline format version {0}").format(snapshot.get("v")))
+    return snapshot
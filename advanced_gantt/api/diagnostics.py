@@ -0,0 +1,102 @@
+import frappe
+from frappe import _
+from frappe.utils import nowdate, add_days, cint
+
+
+@frappe.whitelist()
+def get_gantt_query_plans(project=None):
+    """Run EXPLAIN on each query issued by the Gantt endpoints"""
+    frappe.only_for("System Manager")
+
+    project = project or get_sample_project()
+    task = frappe.db.get_value("Task", {"project": project}, "name") or ""
+    start_date = add_days(nowdate(), -30)
+    end_date = add_days(nowdate(), 90)
+    task_names = [task]
+
+    queries = {
+        "get_projects_data": frappe.get_all(
+            "Project",
+            filters={"name": project, "expected_start_date": ["between", [start_date, end_date]]},
+            fields=["name"],
+            run=0
+        ),
+        "get_tasks_data": frappe.get_all(
+            "Task",
+            filters={"project": project, "exp_start_date": ["between", [start_date, end_date]]},
+            fields=["name"],
+            run=0
+        ),
+        "get_dependencies_data": frappe.get_all(
+            "Task Depends On",
+            filters={"task": ["in", task_names]},
+            fields=["parent", "task", "depends_on_task"],
+            run=0
+        ),
+        "get_assignments_data": frappe.get_all(
+            "Task Assigned To",
+            filters={"parent": ["in", task_names]},
+            fields=["parent", "assigned_to"],
+            run=0
+        ),
+        "create_task_dependency": frappe.get_all(
+            "Task Depends On",
+            filters={"parent": task, "depends_on_task": task},
+            fields=["name"],
+            limit=1,
+            run=0
+        )
+    }
+
+    plans = []
+    for query_name, query in queries.items():
+        try:
+            plan = frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+        except Exception as e:
+            # Child tables differ between ERPNext versions
+            plans.append({"query": query_name, "sql": str(query), "error": str(e)})
+            continue
+
+        plans.append({
+            "query": query_name,
+            "sql": str(query),
+            "plan": plan,
+            "full_scan": any((row.get("type") or "").upper() == "ALL" for row in plan)
+        })
+
+    return {"project": project, "plans": plans}
+
+
+def get_sample_project():
+    """Pick the project with the most tasks so the plans reflect a large table"""
+    result = frappe.db.sql(
+        """
+        select project from `tabTask`
+        where ifnull(project, '') != ''
+        group by project
+        order by count(*) desc
+        limit 1
+        """
+    )
+
+    if not result:
+        frappe.throw(_("No tasks with a project found to explain the Gantt queries"))
+
+    return result[0][0]
+
+
+@frappe.whitelist()
+def get_lock_statistics():
+    """Get the InnoDB row lock and deadlock counters of the database server"""
+    frappe.only_for("System Manager")
+
+    status = frappe.db.sql(
+        """
+        show global status
+        where Variable_name in (
+            'Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_deadlocks'
+        )
+        """
+    )
+
+    return {name: cint(value) for name, value in status}
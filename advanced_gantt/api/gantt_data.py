@@ -1,11 +1,14 @@
 import frappe
 from frappe import _
-from frappe.utils import getdate, get_datetime, nowdate, add_days
+from frappe.utils import getdate, get_datetime, nowdate, add_days, cint
 import json
 
+from advanced_gantt.api.baselines import get_task_baselines
+from advanced_gantt.api.working_calendar import get_task_calendars, get_bryntum_calendars, COMPILE_MARGIN_DAYS
+
 
 @frappe.whitelist()
-def get_gantt_data(project=None, start_date=None, end_date=None):
+def get_gantt_data(project=None, start_date=None, end_date=None, include_baselines=0):
     """
     Get Gantt chart data from ERPNext Project and Task doctypes
     Returns data in Bryntum Gantt format
@@ -26,14 +29,30 @@ def get_gantt_data(project=None, start_date=None, end_date=None):
         # Get dependencies data
         dependencies_data = get_dependencies_data(project)
         
+        # Working calendars, padded so tasks dragged outside the range still see holidays
+        task_calendars = get_task_calendars(tasks_data)
+        calendars = get_bryntum_calendars(
+            task_calendars,
+            add_days(start_date, -COMPILE_MARGIN_DAYS),
+            add_days(end_date, COMPILE_MARGIN_DAYS)
+        )
+        
         # Transform data to Bryntum format
         gantt_data = {
-            "tasks": transform_tasks_for_bryntum(projects_data, tasks_data),
+            "tasks": transform_tasks_for_bryntum(projects_data, tasks_data, task_calendars),
             "dependencies": transform_dependencies_for_bryntum(dependencies_data),
             "resources": get_resources_data(),
-            "assignments": get_assignments_data(project)
+            "assignments": get_assignments_data(project),
+            "calendars": calendars
         }
         
+        # Attach saved baselines in the per-task `baselines` field Bryntum expects
+        if cint(include_baselines) and project:
+            task_baselines = get_task_baselines(project)
+            for task in gantt_data["tasks"]:
+                if task["id"] in task_baselines:
+                    task["baselines"] = task_baselines[task["id"]]
+        
         return gantt_data
         
     except Exception as e:
@@ -160,8 +179,12 @@ def get_assignments_data(project=None):
     return bryntum_assignments
 
 
-def transform_tasks_for_bryntum(projects_data, tasks_data):
-    """Transform ERPNext projects and tasks to Bryntum Gantt format"""
+def transform_tasks_for_bryntum(projects_data, tasks_data, task_calendars=None):
+    """
+    Transform ERPNext projects and tasks to Bryntum Gantt format
+    When task_calendars is given, each task gets its Bryntum calendar id and
+    its inclusive working day count in `workingDays`
+    """
     bryntum_tasks = []
     
     # Add projects as parent tasks
@@ -192,11 +215,14 @@ def transform_tasks_for_bryntum(projects_data, tasks_data):
         elif task.project:
             parent_id = f"project_{task.project}"
         
-        bryntum_tasks.append({
+        start_date = task.exp_start_date or task.act_start_date
+        end_date = task.exp_end_date or task.act_end_date
+        
+        bryntum_task = {
             "id": task.name,
             "name": task.subject,
-            "startDate": task.exp_start_date or task.act_start_date,
-            "endDate": task.exp_end_date or task.act_end_date,
+            "startDate": start_date,
+            "endDate": end_date,
             "percentDone": task.progress or 0,
             "parentId": parent_id,
             "leaf": True,
@@ -211,7 +237,16 @@ def transform_tasks_for_bryntum(projects_data, tasks_data):
             "department": task.department,
             "company": task.company,
             "description": task.description
-        })
+        }
+        
+        # Bryntum derives duration from the dates and the calendar itself
+        calendar = task_calendars.get(task.name) if task_calendars else None
+        if calendar:
+            bryntum_task["calendar"] = calendar.name
+            if start_date and end_date:
+                bryntum_task["workingDays"] = calendar.working_days_between(start_date, end_date)
+        
+        bryntum_tasks.append(bryntum_task)
     
     return bryntum_tasks
 
@@ -233,18 +268,41 @@ def transform_dependencies_for_bryntum(dependencies_data):
 
 
 @frappe.whitelist()
-def update_task_dates(task_id, start_date, end_date):
-    """Update task dates when dragged in Gantt chart"""
+def update_task_dates(task_id, start_date, end_date, keep_working_duration=0):
+    """
+    Update task dates when dragged in Gantt chart
+    With keep_working_duration the task is moved to start on the next working
+    day and keeps its duration in working days, skipping holidays
+    """
     try:
         if not frappe.has_permission("Task", "write"):
             frappe.throw(_("No permission to update tasks"))
         
         task_doc = frappe.get_doc("Task", task_id)
-        task_doc.exp_start_date = getdate(start_date)
-        task_doc.exp_end_date = getdate(end_date)
+        start_date = getdate(start_date)
+        end_date = getdate(end_date)
+        
+        if cint(keep_working_duration) and task_doc.exp_start_date and task_doc.exp_end_date:
+            calendar = get_task_calendars([frappe._dict({
+                "name": task_doc.name,
+                "company": task_doc.company,
+                "assigned_to": task_doc.get("assigned_to")
+            })])[task_doc.name]
+            
+            duration = max(calendar.working_days_between(task_doc.exp_start_date, task_doc.exp_end_date), 1)
+            start_date = calendar.add_working_days(start_date, 0)
+            end_date = calendar.add_working_days(start_date, duration - 1)
+        
+        task_doc.exp_start_date = start_date
+        task_doc.exp_end_date = end_date
         task_doc.save()
         
-        return {"status": "success", "message": _("Task dates updated successfully")}
+        return {
+            "status": "success",
+            "start_date": task_doc.exp_start_date,
+            "end_date": task_doc.exp_end_date,
+            "message": _("Task dates updated successfully")
+        }
         
     except Exception as e:
         frappe.log_error(f"Error updating task dates: {str(e)}")
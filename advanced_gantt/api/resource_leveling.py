@@ -0,0 +1,339 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, add_days, cint, flt
+from collections import defaultdict
+import heapq
+import json
+
+from advanced_gantt.api.working_calendar import get_task_calendars
+
+
+# Lower rank is scheduled first when tasks compete for the same day
+PRIORITY_RANK = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
+
+# Tasks that have finished or started keep their dates
+FIXED_STATUSES = ("Completed", "Cancelled")
+
+# Allocation of one Task Assigned To row, matching get_assignments_data
+ASSIGNMENT_UNITS = 100
+
+
+@frappe.whitelist()
+def level_resources(project=None, projects=None, apply=0, capacity=ASSIGNMENT_UNITS):
+    """
+    Delay tasks within their float to remove resource over-allocation.
+    Returns the proposed moves; with apply they are written in one batch.
+    """
+    try:
+        if not frappe.has_permission("Task", "read"):
+            frappe.throw(_("No permission to read tasks"))
+
+        if cint(apply) and not frappe.has_permission("Task", "write"):
+            frappe.throw(_("No permission to update tasks"))
+
+        project_names = get_project_names(project, projects)
+        if not project_names:
+            frappe.throw(_("Select a project or a list of projects to level"))
+
+        tasks, dependencies, assignments = get_leveling_data(project_names)
+
+        # Calendars follow the first assignee, as in get_gantt_data
+        assignees = {}
+        for task_name, user in assignments:
+            assignees.setdefault(task_name, user)
+        for task in tasks:
+            task.assigned_to = assignees.get(task.name)
+
+        result = level_schedule(
+            tasks, dependencies, assignments, flt(capacity) or ASSIGNMENT_UNITS,
+            task_calendars=get_task_calendars(tasks)
+        )
+
+        if cint(apply) and result["moves"]:
+            apply_moves(result["moves"])
+
+        result["applied"] = bool(cint(apply))
+        return result
+
+    except Exception as e:
+        frappe.log_error(f"Error leveling resources: {str(e)}")
+        frappe.throw(_("Error leveling resources: {0}").format(str(e)))
+
+
+def get_project_names(project=None, projects=None):
+    """Accept a single project or a portfolio as a list / JSON list"""
+    if isinstance(projects, str):
+        projects = json.loads(projects) if projects.startswith("[") else projects.split(",")
+
+    names = [name.strip() for name in (projects or []) if name and name.strip()]
+    if project:
+        names.append(project)
+
+    return list(dict.fromkeys(names))
+
+
+def get_leveling_data(project_names):
+    """Get tasks, dependencies and assignments of the projects being leveled"""
+    tasks = frappe.get_all(
+        "Task",
+        filters={"project": ["in", project_names]},
+        fields=[
+            "name", "exp_start_date", "exp_end_date", "priority",
+            "task_weight", "status", "progress", "act_start_date", "company", "is_group"
+        ]
+    )
+
+    # Join on Task so large portfolios do not need a huge IN list of task names
+    dependencies = frappe.db.sql(
+        """
+        select dep.parent, dep.depends_on_task
+        from `tabTask Depends On` dep
+        inner join `tabTask` task on task.name = dep.parent
+        where task.project in %(projects)s
+        """,
+        {"projects": tuple(project_names)}
+    )
+
+    assignments = frappe.db.sql(
+        """
+        select assignment.parent, assignment.assigned_to
+        from `tabTask Assigned To` assignment
+        inner join `tabTask` task on task.name = assignment.parent
+        where task.project in %(projects)s
+        """,
+        {"projects": tuple(project_names)}
+    )
+
+    return tasks, dependencies, assignments
+
+
+def level_schedule(tasks, dependencies, assignments, capacity=ASSIGNMENT_UNITS, task_calendars=None):
+    """
+    Level a schedule in memory.
+    tasks are dicts with the Task fields used by get_leveling_data,
+    dependencies are (task, depends_on_task) pairs and assignments are
+    (task, user) pairs. Dates are handled as integer day offsets.
+    With task_calendars, moved tasks start on a working day and keep their
+    duration in working days, as update_task_dates(keep_working_duration=1) does.
+    Group tasks only summarise their children, so they keep their dates and
+    do not use capacity.
+    """
+    task_calendars = task_calendars or {}
+    tasks = {
+        task.name: task for task in tasks
+        if task.exp_start_date and task.exp_end_date
+    }
+    if not tasks:
+        return {"moves": [], "unresolved": []}
+
+    epoch = min(getdate(task.exp_start_date) for task in tasks.values())
+    start = {}
+    duration = {}
+    working_days = {}
+    for name, task in tasks.items():
+        start[name] = (getdate(task.exp_start_date) - epoch).days
+        duration[name] = max((getdate(task.exp_end_date) - getdate(task.exp_start_date)).days + 1, 1)
+        if name in task_calendars:
+            working_days[name] = max(
+                task_calendars[name].working_days_between(task.exp_start_date, task.exp_end_date), 1
+            )
+
+    def span(name, slot):
+        """Snapped start offset and length in calendar days of the task started at slot"""
+        # Tasks that stay where they are keep their dates
+        if name not in working_days or slot == start[name]:
+            return slot, duration[name]
+
+        calendar = task_calendars[name]
+        first = calendar.add_working_days(add_days(epoch, slot), 0)
+        last = calendar.add_working_days(first, working_days[name] - 1)
+        return (first - epoch).days, (last - first).days + 1
+
+    predecessors = defaultdict(dict)
+    successors = defaultdict(list)
+    for task_name, depends_on in dependencies:
+        if task_name in tasks and depends_on in tasks and task_name != depends_on:
+            # Gap between the predecessor's end and the successor's start in the
+            # current plan; existing overlaps are preserved rather than fixed
+            lag = start[task_name] - (start[depends_on] + duration[depends_on])
+            # Duplicate Task Depends On rows must count as one link
+            if depends_on not in predecessors[task_name]:
+                successors[depends_on].append(task_name)
+            predecessors[task_name][depends_on] = min(lag, 0)
+
+    groups = {name for name, task in tasks.items() if cint(task.get("is_group"))}
+
+    resources = defaultdict(set)
+    for task_name, user in assignments:
+        if task_name in tasks and task_name not in groups and user:
+            resources[task_name].add(user)
+
+    fixed = groups | {
+        name for name, task in tasks.items()
+        if task.status in FIXED_STATUSES or flt(task.progress) > 0 or task.get("act_start_date")
+    }
+
+    order, cyclic = topological_order(tasks, predecessors)
+    # Tasks in a dependency cycle cannot be scheduled safely, so keep them in place
+    fixed |= cyclic
+
+    latest_start = compute_latest_start(order, start, duration, successors, predecessors, fixed)
+
+    # Per-resource capacity timelines: day offset -> allocated units
+    usage = defaultdict(lambda: defaultdict(int))
+    for name in fixed:
+        reserve(usage, resources[name], start[name], duration[name])
+
+    new_start = {}
+    new_duration = {}
+    unresolved = []
+    remaining = {name: len(predecessors[name]) for name in order}
+    ready = []
+
+    def push(name):
+        required = start[name]
+        for predecessor, lag in predecessors[name].items():
+            required = max(required, new_start[predecessor] + new_duration[predecessor] + lag)
+
+        task = tasks[name]
+        heapq.heappush(ready, (
+            required,
+            PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK)),
+            -flt(task.task_weight),
+            latest_start[name],
+            name
+        ))
+
+    for name in order:
+        if not remaining[name]:
+            push(name)
+
+    while ready:
+        required, _rank, _weight, latest, name = heapq.heappop(ready)
+
+        if name in fixed:
+            new_start[name], new_duration[name] = start[name], duration[name]
+        else:
+            slot = find_slot(usage, resources[name], required, latest, lambda slot: span(name, slot), capacity)
+            if slot is None:
+                slot = span(name, required)
+                unresolved.append(name)
+            new_start[name], new_duration[name] = slot
+            reserve(usage, resources[name], *slot)
+
+        for successor in successors[name]:
+            if name in predecessors[successor]:
+                remaining[successor] -= 1
+                if not remaining[successor]:
+                    push(successor)
+
+    moves = []
+    for name in order:
+        if name in new_start and (new_start[name], new_duration[name]) != (start[name], duration[name]):
+            moves.append({
+                "task": name,
+                "oldStart": add_days(epoch, start[name]),
+                "oldEnd": add_days(epoch, start[name] + duration[name] - 1),
+                "newStart": add_days(epoch, new_start[name]),
+                "newEnd": add_days(epoch, new_start[name] + new_duration[name] - 1),
+                "delay": new_start[name] - start[name],
+                "resources": sorted(resources[name])
+            })
+
+    return {"moves": moves, "unresolved": unresolved}
+
+
+def topological_order(tasks, predecessors):
+    """Kahn's algorithm; returns the order and the tasks left in cycles"""
+    indegree = {name: len(predecessors[name]) for name in tasks}
+    successors = defaultdict(list)
+    for name in tasks:
+        for predecessor in predecessors[name]:
+            successors[predecessor].append(name)
+
+    queue = [name for name, degree in indegree.items() if not degree]
+    order = []
+    while queue:
+        name = queue.pop()
+        order.append(name)
+        for successor in successors[name]:
+            indegree[successor] -= 1
+            if not indegree[successor]:
+                queue.append(successor)
+
+    cyclic = set(tasks) - set(order)
+    for name in cyclic:
+        # Drop dependencies inside cycles so the tasks can still be placed
+        predecessors[name] = {
+            predecessor: lag for predecessor, lag in predecessors[name].items()
+            if predecessor not in cyclic
+        }
+
+    return order + sorted(cyclic), cyclic
+
+
+def compute_latest_start(order, start, duration, successors, predecessors, fixed):
+    """Backward pass: the latest start of each task that keeps the current finish dates"""
+    project_finish = max(start[name] + duration[name] - 1 for name in order)
+    latest_start = {}
+
+    for name in reversed(order):
+        if name in fixed:
+            latest_start[name] = start[name]
+            continue
+
+        latest_finish = project_finish
+        for successor in successors[name]:
+            if successor in latest_start and name in predecessors[successor]:
+                lag = predecessors[successor][name]
+                latest_finish = min(latest_finish, latest_start[successor] - 1 - lag)
+
+        # Never earlier than the current start: leveling only delays tasks
+        latest_start[name] = max(latest_finish - duration[name] + 1, start[name])
+
+    return latest_start
+
+
+def find_slot(usage, task_resources, earliest, latest, span, capacity):
+    """
+    Earliest (start, duration) in [earliest, latest] where every resource has
+    capacity for the task; span maps a candidate start to the task's days
+    """
+    slot, duration = span(earliest)
+    while slot <= latest:
+        conflict = None
+        for day in range(slot, slot + duration):
+            if any(usage[resource][day] + ASSIGNMENT_UNITS > capacity for resource in task_resources):
+                conflict = day
+                break
+
+        if conflict is None:
+            return slot, duration
+
+        # No start before the day after the conflict can avoid it
+        slot, duration = span(conflict + 1)
+
+    return None
+
+
+def reserve(usage, task_resources, slot, duration):
+    """Allocate the task's resources on its days"""
+    for resource in task_resources:
+        timeline = usage[resource]
+        for day in range(slot, slot + duration):
+            timeline[day] += ASSIGNMENT_UNITS
+
+
+def apply_moves(moves):
+    """Write all moved task dates in one batch"""
+    frappe.db.bulk_update(
+        "Task",
+        {
+            move["task"]: {
+                "exp_start_date": move["newStart"],
+                "exp_end_date": move["newEnd"]
+            }
+            for move in moves
+        }
+    )
+    frappe.db.commit()
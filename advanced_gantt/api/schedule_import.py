@@ -0,0 +1,499 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, get_datetime, now_datetime, flt, cint
+import csv
+import re
+import xml.etree.ElementTree as ElementTree
+
+
+# Number of tasks written per bulk insert / transaction
+IMPORT_CHUNK_SIZE = 2000
+
+# Naming series used by ERPNext for Task
+TASK_NAMING_SERIES = "TASK-.YYYY.-"
+TASK_NAME_DIGITS = 5
+
+MSP_NAMESPACE = "{http://schemas.microsoft.com/project}"
+
+# Predecessor references such as "12", "12FS", "12SS+2d", "12+1w" or "1.2.3".
+# A +/- only starts a lag after a type code or as a number with a duration
+# unit, so hyphenated ids like "T-001" or "TASK-2024-00012" stay whole
+PREDECESSOR_PATTERN = re.compile(
+    r"^\s*(.+?)\s*(?:"
+    r"(?:FS|SS|FF|SF)\s*(?:[+-]\s*\d+(?:\.\d+)?\s*[a-z%]*)?"
+    r"|[+-]\s*\d+(?:\.\d+)?\s*e?(?:mins?|m|hrs?|h|days?|d|wks?|w|mons?|mo)"
+    r")?\s*$",
+    re.IGNORECASE
+)
+
+# Unresolved predecessor references listed in the import status
+UNRESOLVED_SAMPLE_SIZE = 20
+
+CSV_COLUMNS = {
+    "id": ("id", "task id", "unique id", "uid"),
+    "wbs": ("wbs", "outline number", "outline"),
+    "subject": ("subject", "name", "task name", "task"),
+    "start": ("start", "start date", "exp_start_date"),
+    "finish": ("finish", "end", "end date", "finish date", "exp_end_date"),
+    "progress": ("progress", "% complete", "percent complete", "percent_complete"),
+    "predecessors": ("predecessors", "depends on", "depends_on"),
+    "assigned_to": ("assigned to", "assigned_to", "resource names", "resources"),
+    "milestone": ("milestone", "is_milestone", "is milestone")
+}
+
+
+@frappe.whitelist()
+def start_schedule_import(file_url, project, file_format=None):
+    """Queue a bulk import of a CSV or MS Project XML schedule into a project"""
+    try:
+        if not frappe.has_permission("Task", "create"):
+            frappe.throw(_("No permission to create tasks"))
+
+        if not frappe.db.exists("Project", project):
+            frappe.throw(_("Project {0} not found").format(project))
+
+        file_format = (file_format or file_url.rsplit(".", 1)[-1]).lower()
+        if file_format not in ("csv", "xml"):
+            frappe.throw(_("Unsupported schedule format: {0}").format(file_format))
+
+        # The rows end up as Task subjects, so the user must be able to read the file itself
+        file_doc = frappe.get_doc("File", {"file_url": file_url})
+        if not frappe.has_permission("File", "read", doc=file_doc):
+            frappe.throw(_("No permission to read {0}").format(file_url))
+
+        file_path = file_doc.get_full_path()
+        job_id = frappe.generate_hash(length=10)
+
+        set_import_status(job_id, {"status": "Queued", "processed": 0, "total": 0})
+        frappe.enqueue(
+            "advanced_gantt.api.schedule_import.run_schedule_import",
+            queue="long",
+            timeout=3600,
+            job_id=f"gantt_schedule_import::{job_id}",
+            import_id=job_id,
+            file_path=file_path,
+            file_format=file_format,
+            project=project,
+            user=frappe.session.user
+        )
+
+        return {"status": "queued", "job_id": job_id, "message": _("Schedule import queued")}
+
+    except Exception as e:
+        frappe.log_error(f"Error starting schedule import: {str(e)}")
+        frappe.throw(_("Error starting schedule import: {0}").format(str(e)))
+
+
+@frappe.whitelist()
+def get_schedule_import_status(job_id):
+    """Get the progress of a queued schedule import"""
+    return frappe.cache().get_value(f"gantt_schedule_import::{job_id}") or {"status": "Unknown"}
+
+
+def run_schedule_import(import_id, file_path, file_format, project, user):
+    """Background job: parse, resolve and bulk insert a schedule"""
+    progress = {"processed": 0, "total": 0}
+
+    try:
+        rows = iter_csv_rows(file_path) if file_format == "csv" else iter_msproject_rows(file_path)
+        records, unresolved = resolve_schedule(rows)
+        progress["total"] = len(records)
+        # Reported with every status so references dropped by the import are visible
+        progress["unresolved_references"] = len(unresolved)
+        progress["unresolved_sample"] = unresolved[:UNRESOLVED_SAMPLE_SIZE]
+
+        set_import_status(import_id, {"status": "Running", **progress}, user)
+
+        def on_chunk(processed):
+            progress["processed"] = processed
+            set_import_status(import_id, {"status": "Running", **progress}, user)
+
+        insert_schedule(records, project, user, on_chunk)
+
+        set_import_status(import_id, {"status": "Completed", **progress}, user)
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Error importing schedule: {str(e)}")
+        # processed now counts the tasks that were written and removed again
+        set_import_status(import_id, {"status": "Failed", "error": str(e), **progress}, user)
+
+
+def set_import_status(import_id, status, user=None):
+    """Store import progress for polling and push it to the user's desk"""
+    frappe.cache().set_value(f"gantt_schedule_import::{import_id}", status, expires_in_sec=86400)
+
+    if user:
+        frappe.publish_realtime(
+            "advanced_gantt_import_progress",
+            {"job_id": import_id, **status},
+            user=user
+        )
+
+
+def iter_csv_rows(file_path):
+    """Stream normalized task rows from a CSV file"""
+    with open(file_path, newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.DictReader(csv_file)
+        columns = map_csv_columns(reader.fieldnames or [])
+
+        for line_number, row in enumerate(reader, start=1):
+            values = {key: (row.get(header) or "").strip() for key, header in columns.items()}
+
+            yield {
+                "key": values.get("id") or str(line_number),
+                "wbs": values.get("wbs", ""),
+                "subject": values.get("subject", ""),
+                "start": values.get("start", ""),
+                "finish": values.get("finish", ""),
+                "progress": flt(values.get("progress", "").rstrip("%")),
+                "predecessors": split_list(values.get("predecessors")),
+                "assigned_to": split_list(values.get("assigned_to")),
+                "milestone": values.get("milestone", "").lower() in ("1", "yes", "true")
+            }
+
+
+def map_csv_columns(fieldnames):
+    """Map the known schedule columns to the headers present in the file"""
+    headers = {fieldname.strip().lower(): fieldname for fieldname in fieldnames}
+    columns = {}
+
+    for key, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in headers:
+                columns[key] = headers[alias]
+                break
+
+    if "subject" not in columns:
+        frappe.throw(_("The schedule file needs a Subject or Name column"))
+
+    return columns
+
+
+def iter_msproject_rows(file_path):
+    """Stream normalized task rows from an MS Project XML file"""
+    tasks = []
+    resources = {}
+    assignments = {}
+
+    # iterparse keeps memory flat: every element is cleared once read
+    for _event, element in ElementTree.iterparse(file_path, events=("end",)):
+        tag = element.tag.replace(MSP_NAMESPACE, "")
+
+        if tag == "Task":
+            uid = element.findtext(f"{MSP_NAMESPACE}UID")
+            # UID 0 is the project summary task
+            if uid and uid != "0":
+                tasks.append({
+                    "key": uid,
+                    "wbs": element.findtext(f"{MSP_NAMESPACE}WBS") or element.findtext(f"{MSP_NAMESPACE}OutlineNumber") or "",
+                    "subject": element.findtext(f"{MSP_NAMESPACE}Name") or "",
+                    "start": element.findtext(f"{MSP_NAMESPACE}Start") or "",
+                    "finish": element.findtext(f"{MSP_NAMESPACE}Finish") or "",
+                    "progress": flt(element.findtext(f"{MSP_NAMESPACE}PercentComplete")),
+                    "predecessors": [
+                        link.findtext(f"{MSP_NAMESPACE}PredecessorUID")
+                        for link in element.findall(f"{MSP_NAMESPACE}PredecessorLink")
+                    ],
+                    "assigned_to": [],
+                    "milestone": element.findtext(f"{MSP_NAMESPACE}Milestone") == "1"
+                })
+            element.clear()
+
+        elif tag == "Resource":
+            uid = element.findtext(f"{MSP_NAMESPACE}UID")
+            email = element.findtext(f"{MSP_NAMESPACE}EmailAddress") or element.findtext(f"{MSP_NAMESPACE}Name")
+            if uid and email:
+                resources[uid] = email
+            element.clear()
+
+        elif tag == "Assignment":
+            task_uid = element.findtext(f"{MSP_NAMESPACE}TaskUID")
+            resource_uid = element.findtext(f"{MSP_NAMESPACE}ResourceUID")
+            if task_uid and resource_uid:
+                assignments.setdefault(task_uid, []).append(resource_uid)
+            element.clear()
+
+    # Resources and assignments follow the tasks in the file
+    for task in tasks:
+        task["assigned_to"] = [
+            resources[uid] for uid in assignments.get(task["key"], []) if uid in resources
+        ]
+        yield task
+
+
+def split_list(value):
+    """Split a comma or semicolon separated cell"""
+    return [item.strip() for item in re.split(r"[,;]", value or "") if item.strip()]
+
+
+def resolve_schedule(rows):
+    """
+    Resolve WBS parents, predecessors and assignees to positions in the record list.
+    Returns the records and the predecessor references that matched no task.
+    """
+    records = []
+    unresolved = []
+    position_by_key = {}
+    position_by_wbs = {}
+
+    for row in rows:
+        if not row["subject"]:
+            continue
+        position_by_key[row["key"]] = len(records)
+        if row["wbs"]:
+            position_by_wbs[row["wbs"]] = len(records)
+        records.append(row)
+
+    assignees = list({user for record in records for user in record["assigned_to"]})
+    valid_users = set(frappe.get_all(
+        "User", filters={"enabled": 1, "name": ["in", assignees]}, pluck="name"
+    )) if assignees else set()
+
+    for position, record in enumerate(records):
+        parent_wbs = record["wbs"].rpartition(".")[0]
+        record["parent"] = position_by_wbs.get(parent_wbs) if parent_wbs else None
+
+        record["depends_on"] = []
+        for reference in record["predecessors"]:
+            predecessor = find_predecessor(reference, position_by_key, position_by_wbs)
+            if predecessor is None:
+                unresolved.append(f"{record['key']}: {reference}")
+            elif predecessor != position and predecessor not in record["depends_on"]:
+                record["depends_on"].append(predecessor)
+
+        record["assigned_to"] = [user for user in record["assigned_to"] if user in valid_users]
+
+    for record in records:
+        if record["parent"] is not None:
+            records[record["parent"]]["is_group"] = True
+
+    return records, unresolved
+
+
+def find_predecessor(reference, position_by_key, position_by_wbs):
+    """Position of the task a predecessor reference points to, by id first and then WBS"""
+    reference = (reference or "").strip()
+    # An exact id wins, so ids that look like a lag such as "T-1d" still resolve
+    keys = [reference]
+
+    match = PREDECESSOR_PATTERN.match(reference)
+    if match and match.group(1) != reference:
+        keys.append(match.group(1))
+
+    for key in keys:
+        for positions in (position_by_key, position_by_wbs):
+            if key in positions:
+                return positions[key]
+
+    return None
+
+
+def insert_schedule(records, project, user, on_chunk=None):
+    """
+    Bulk insert resolved records into a project, one transaction per chunk.
+    If a chunk fails, the tasks already written are deleted again, so a
+    failed import leaves nothing behind and can simply be rerun.
+    """
+    total = len(records)
+    if not total:
+        return []
+
+    names = reserve_task_names(total)
+    frappe.db.commit()
+
+    order = assign_nested_set(records, get_next_lft())
+    written = 0
+
+    try:
+        for start in range(0, total, IMPORT_CHUNK_SIZE):
+            insert_task_chunk(records, names, order[start:start + IMPORT_CHUNK_SIZE], project, user)
+            frappe.db.commit()
+
+            written = min(start + IMPORT_CHUNK_SIZE, total)
+            if on_chunk:
+                on_chunk(written)
+
+    except Exception:
+        frappe.db.rollback()
+        delete_tasks([names[position] for position in order[:written]])
+        release_task_names(names)
+        frappe.db.commit()
+        raise
+
+    return names
+
+
+def get_next_lft():
+    """First free nested set value of Task; locks the end of the tree until the first chunk commits"""
+    return cint(frappe.db.sql("select max(`rgt`) from `tabTask` for update")[0][0]) + 1
+
+
+def assign_nested_set(records, next_lft):
+    """
+    Set lft / rgt on every record for the imported trees, appended as new
+    roots after next_lft, so the rest of the Task tree is left untouched.
+    Returns the insert order: the last root holds the highest rgt and goes
+    first, so the whole range is claimed as soon as the first chunk commits.
+    """
+    children = [[] for _record in records]
+    roots = []
+    for position, record in enumerate(records):
+        if record["parent"] is None:
+            roots.append(position)
+        else:
+            children[record["parent"]].append(position)
+
+    counter = next_lft
+    # Iterative depth first walk; WBS trees can be deeper than the recursion limit
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            position, visited = stack.pop()
+            if visited:
+                records[position]["rgt"] = counter
+                counter += 1
+                continue
+
+            records[position]["lft"] = counter
+            counter += 1
+            stack.append((position, True))
+            stack.extend((child, False) for child in reversed(children[position]))
+
+    return [roots[-1]] + [position for position in range(len(records)) if position != roots[-1]]
+
+
+def delete_tasks(names):
+    """Remove bulk inserted tasks together with their child rows"""
+    for batch in split_chunks(names, IMPORT_CHUNK_SIZE):
+        for doctype in ("Task Depends On", "Task Assigned To"):
+            frappe.db.sql(
+                f"delete from `tab{doctype}` where `parenttype` = 'Task' and `parent` in %s", (batch,)
+            )
+        frappe.db.sql("delete from `tabTask` where `name` in %s", (batch,))
+
+
+def split_chunks(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def reserve_task_names(count):
+    """Reserve a contiguous block of Task names from the naming series"""
+    from frappe.model.naming import parse_naming_series
+
+    prefix = parse_naming_series(TASK_NAMING_SERIES)
+
+    frappe.db.sql(
+        "insert ignore into `tabSeries` (`name`, `current`) values (%s, 0)", (prefix,)
+    )
+    current = cint(frappe.db.sql(
+        "select `current` from `tabSeries` where `name` = %s for update", (prefix,)
+    )[0][0])
+    frappe.db.sql(
+        "update `tabSeries` set `current` = `current` + %s where `name` = %s", (count, prefix)
+    )
+
+    return [f"{prefix}{str(current + i).zfill(TASK_NAME_DIGITS)}" for i in range(1, count + 1)]
+
+
+def release_task_names(names):
+    """Give reserved names back to the series unless newer names were taken since"""
+    from frappe.model.naming import parse_naming_series
+
+    prefix = parse_naming_series(TASK_NAMING_SERIES)
+    last = cint(names[-1][len(prefix):])
+
+    frappe.db.sql(
+        "update `tabSeries` set `current` = `current` - %s where `name` = %s and `current` = %s",
+        (len(names), prefix, last)
+    )
+
+
+def get_child_table_field(doctype, child_doctype):
+    """Get the fieldname of the table of `child_doctype` in `doctype`"""
+    for field in frappe.get_meta(doctype).get_table_fields():
+        if field.options == child_doctype:
+            return field.fieldname
+    return None
+
+
+def insert_task_chunk(records, names, positions, project, user):
+    """
+    Bulk insert one chunk of tasks together with their dependency and assignment rows.
+    Records need lft / rgt from assign_nested_set. Fields that Task.validate
+    would fill in are set here, since bulk inserts skip it.
+    """
+    timestamp = now_datetime()
+    depends_on_field = get_child_table_field("Task", "Task Depends On")
+    assigned_to_field = get_child_table_field("Task", "Task Assigned To")
+    company = frappe.get_cached_value("Project", project, "company")
+    priority = frappe.get_meta("Task").get_field("priority").default
+
+    task_values = []
+    dependency_values = []
+    assignment_values = []
+
+    for position in positions:
+        record = records[position]
+        name = names[position]
+        progress = min(record["progress"], 100)
+        parent_task = names[record["parent"]] if record["parent"] is not None else None
+
+        task_values.append((
+            name, timestamp, timestamp, user, user, 0, 0,
+            TASK_NAMING_SERIES,
+            record["subject"][:140],
+            project,
+            company,
+            "Completed" if progress >= 100 else "Open",
+            priority,
+            parse_schedule_date(record["start"]),
+            parse_schedule_date(record["finish"]),
+            progress,
+            parent_task,
+            parent_task,
+            1 if record.get("is_group") else 0,
+            1 if record["milestone"] else 0,
+            record["lft"],
+            record["rgt"],
+            # Same format as Task.update_depends_on
+            "".join(f"{names[predecessor]}," for predecessor in record["depends_on"])
+        ))
+
+        for idx, predecessor in enumerate(record["depends_on"], start=1):
+            dependency_values.append((
+                frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0, idx,
+                name, "Task", depends_on_field, names[predecessor]
+            ))
+
+        for idx, assignee in enumerate(record["assigned_to"], start=1):
+            assignment_values.append((
+                frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0, idx,
+                name, "Task", assigned_to_field, assignee
+            ))
+
+    standard_fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus", "idx"]
+    child_fields = standard_fields + ["parent", "parenttype", "parentfield"]
+
+    frappe.db.bulk_insert(
+        "Task",
+        standard_fields + [
+            "naming_series", "subject", "project", "company", "status", "priority",
+            "exp_start_date", "exp_end_date", "progress", "parent_task", "old_parent", "is_group",
+            "is_milestone", "lft", "rgt", "depends_on_tasks"
+        ],
+        task_values
+    )
+
+    if dependency_values:
+        frappe.db.bulk_insert("Task Depends On", child_fields + ["depends_on_task"], dependency_values)
+
+    if assignment_values:
+        frappe.db.bulk_insert("Task Assigned To", child_fields + ["assigned_to"], assignment_values)
+
+
+def parse_schedule_date(value):
+    """Parse a date or MS Project datetime string"""
+    if not value:
+        return None
+    return getdate(get_datetime(value))
@@ -0,0 +1,248 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, nowdate, add_days
+from datetime import timedelta
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Used when neither the employee nor the company has a Holiday List
+DEFAULT_WEEKLY_OFF = ("Saturday", "Sunday")
+
+# Days added on each side when a calendar has to cover a date outside its range
+COMPILE_MARGIN_DAYS = 366
+
+# How often add_working_days may extend the calendar before giving up
+MAX_RANGE_EXTENSIONS = 10
+
+CALENDAR_CACHE_PREFIX = "gantt_working_calendar::"
+DEFAULT_CALENDAR = "__default__"
+
+
+class WorkingCalendar:
+    """
+    Working days compiled into prefix sums over a date range.
+    prefix[i] is the number of working days before start + i days, and
+    working_offsets[k] is the offset of the k-th working day, so both
+    counting and adding working days are O(1) lookups.
+    """
+
+    def __init__(self, start_date, end_date, holidays=(), weekly_off=DEFAULT_WEEKLY_OFF, holiday_range=None, name=None):
+        self.name = name or DEFAULT_CALENDAR
+        self.holidays = frozenset(getdate(holiday) for holiday in holidays)
+        self.weekly_off = frozenset(WEEKDAYS.index(day) for day in weekly_off)
+        # Inside holiday_range only the listed holidays are non-working days,
+        # outside it the weekly off pattern applies
+        self.holiday_range = tuple(getdate(day) for day in holiday_range) if holiday_range else None
+        self.compile(getdate(start_date), getdate(end_date))
+
+    def compile(self, start, end):
+        """Build the prefix sum and working day index for [start, end]"""
+        days = (end - start).days + 1
+        prefix = [0] * (days + 1)
+        working_offsets = []
+
+        day = start
+        for offset in range(days):
+            working = self.is_working(day)
+            prefix[offset + 1] = prefix[offset] + working
+            if working:
+                working_offsets.append(offset)
+            day += timedelta(days=1)
+
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+        self.working_offsets = working_offsets
+
+    def is_working(self, day):
+        """Check a single day without the compiled arrays"""
+        if self.holiday_range and self.holiday_range[0] <= day <= self.holiday_range[1]:
+            return day not in self.holidays
+        return day.weekday() not in self.weekly_off and day not in self.holidays
+
+    def ensure_range(self, *dates):
+        """Recompile with a margin when a date falls outside the compiled range"""
+        first, last = min(dates), max(dates)
+        if first < self.start or last > self.end:
+            self.compile(
+                min(first, self.start) - timedelta(days=COMPILE_MARGIN_DAYS),
+                max(last, self.end) + timedelta(days=COMPILE_MARGIN_DAYS)
+            )
+
+    def offset(self, date):
+        return (date - self.start).days
+
+    def is_working_day(self, date):
+        date = getdate(date)
+        self.ensure_range(date)
+        offset = self.offset(date)
+        return self.prefix[offset + 1] > self.prefix[offset]
+
+    def working_days_between(self, start_date, end_date):
+        """Number of working days from start_date to end_date, both inclusive"""
+        start_date, end_date = getdate(start_date), getdate(end_date)
+        if end_date < start_date:
+            return 0
+
+        self.ensure_range(start_date, end_date)
+        return self.prefix[self.offset(end_date) + 1] - self.prefix[self.offset(start_date)]
+
+    def add_working_days(self, date, days):
+        """
+        Date that is `days` working days after `date` (before it if negative).
+        A non-working date counts from the next working day, so adding 0
+        snaps a date forward to a working day.
+        """
+        date = getdate(date)
+        self.ensure_range(date)
+
+        for _extension in range(MAX_RANGE_EXTENSIONS + 1):
+            target = self.prefix[self.offset(date)] + days
+            if 0 <= target < len(self.working_offsets):
+                return self.start + timedelta(days=self.working_offsets[target])
+
+            # Target lies outside the compiled range
+            margin = timedelta(days=abs(days) * 2 + COMPILE_MARGIN_DAYS)
+            self.ensure_range(self.start - margin if target < 0 else self.end + margin)
+
+        # e.g. a Holiday List whose weekly offs cover every weekday
+        frappe.throw(
+            _("Working calendar {0} has no {1} working days around {2}").format(
+                self.name, abs(days) or 1, date
+            )
+        )
+
+    def non_working_intervals(self, start_date, end_date):
+        """Runs of consecutive non-working days in [start_date, end_date] as (first, last) pairs"""
+        start_date, end_date = getdate(start_date), getdate(end_date)
+        self.ensure_range(start_date, end_date)
+
+        intervals = []
+        run_start = None
+        for offset in range(self.offset(start_date), self.offset(end_date) + 1):
+            working = self.prefix[offset + 1] > self.prefix[offset]
+            if not working and run_start is None:
+                run_start = offset
+            elif working and run_start is not None:
+                intervals.append((self.start + timedelta(days=run_start), self.start + timedelta(days=offset - 1)))
+                run_start = None
+
+        if run_start is not None:
+            intervals.append((self.start + timedelta(days=run_start), end_date))
+
+        return intervals
+
+
+def get_working_calendar(holiday_list=None):
+    """Get the compiled calendar of a Holiday List, or the default weekend calendar"""
+    cache_key = CALENDAR_CACHE_PREFIX + (holiday_list or DEFAULT_CALENDAR)
+    calendar = frappe.cache().get_value(cache_key)
+
+    if not calendar:
+        calendar = compile_holiday_list(holiday_list)
+        calendar.name = holiday_list or DEFAULT_CALENDAR
+        # The default calendar is compiled around today, so let it roll over
+        expires_in_sec = 86400 if not holiday_list else None
+        frappe.cache().set_value(cache_key, calendar, expires_in_sec=expires_in_sec)
+
+    return calendar
+
+
+def compile_holiday_list(holiday_list=None):
+    """Compile an ERPNext Holiday List into a WorkingCalendar"""
+    today = getdate(nowdate())
+
+    if not holiday_list:
+        return WorkingCalendar(add_days(today, -COMPILE_MARGIN_DAYS), add_days(today, 2 * COMPILE_MARGIN_DAYS))
+
+    holiday_list_doc = frappe.db.get_value(
+        "Holiday List", holiday_list, ["from_date", "to_date"], as_dict=True
+    )
+    if not holiday_list_doc:
+        return compile_holiday_list()
+
+    holidays = frappe.get_all(
+        "Holiday",
+        filters={"parent": holiday_list, "parenttype": "Holiday List"},
+        fields=["holiday_date", "weekly_off"]
+    )
+
+    # Weekly offs generated in the list are reused outside its date range
+    weekly_off = {WEEKDAYS[getdate(h.holiday_date).weekday()] for h in holidays if h.weekly_off}
+
+    from_date = getdate(holiday_list_doc.from_date)
+    to_date = getdate(holiday_list_doc.to_date)
+
+    return WorkingCalendar(
+        min(from_date, add_days(today, -COMPILE_MARGIN_DAYS)),
+        max(to_date, add_days(today, 2 * COMPILE_MARGIN_DAYS)),
+        holidays=[h.holiday_date for h in holidays],
+        weekly_off=weekly_off,
+        holiday_range=(from_date, to_date),
+        name=holiday_list
+    )
+
+
+def get_task_calendars(tasks):
+    """Map each task to the calendar of its assignee's Employee, falling back to its Company"""
+    users = list({task.assigned_to for task in tasks if task.get("assigned_to")})
+    companies = {task.company for task in tasks if task.get("company")}
+
+    employee_holiday_lists = {}
+    if users and frappe.db.table_exists("Employee"):
+        employee_holiday_lists = dict(frappe.get_all(
+            "Employee",
+            filters={"user_id": ["in", users], "holiday_list": ["is", "set"]},
+            fields=["user_id", "holiday_list"],
+            as_list=True
+        ))
+
+    company_holiday_lists = {
+        company: frappe.get_cached_value("Company", company, "default_holiday_list")
+        for company in companies
+    }
+
+    calendars = {}
+    task_calendars = {}
+    for task in tasks:
+        holiday_list = (
+            employee_holiday_lists.get(task.get("assigned_to"))
+            or company_holiday_lists.get(task.get("company"))
+        )
+        if holiday_list not in calendars:
+            calendars[holiday_list] = get_working_calendar(holiday_list)
+        task_calendars[task.name] = calendars[holiday_list]
+
+    return task_calendars
+
+
+def get_bryntum_calendars(task_calendars, start_date, end_date):
+    """
+    Bryntum `calendars` entries for the given task calendars, with every
+    non-working day in [start_date, end_date] as a non-working interval
+    """
+    calendars = {calendar.name: calendar for calendar in task_calendars.values()}
+
+    return [
+        {
+            "id": name,
+            "name": name,
+            "unspecifiedTimeIsWorking": True,
+            "intervals": [
+                {
+                    "startDate": first,
+                    # Bryntum interval ends are exclusive
+                    "endDate": add_days(last, 1),
+                    "isWorking": False
+                }
+                for first, last in calendar.non_working_intervals(start_date, end_date)
+            ]
+        }
+        for name, calendar in calendars.items()
+    ]
+
+
+def clear_calendar_cache(doc, method=None):
+    """Drop the compiled calendar when a Holiday List changes"""
+    frappe.cache().delete_value(CALENDAR_CACHE_PREFIX + doc.name)
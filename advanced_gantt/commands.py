@@ -0,0 +1,92 @@
+import click
+import frappe
+from frappe.commands import pass_context, get_site
+
+
+@click.command("gantt-explain-queries")
+@click.option("--project", help="Project to use in the query filters (defaults to the largest one)")
+@pass_context
+def gantt_explain_queries(context, project=None):
+    """Show the EXPLAIN plan of every Gantt query and flag full table scans"""
+    from advanced_gantt.api.diagnostics import get_gantt_query_plans
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        frappe.set_user("Administrator")
+        result = get_gantt_query_plans(project)
+
+        click.echo(f"Project: {result['project']}")
+        for plan in result["plans"]:
+            click.echo("")
+            click.echo(f"{plan['query']}: {plan['sql']}")
+
+            if plan.get("error"):
+                click.secho(f"  error: {plan['error']}", fg="red")
+                continue
+
+            for row in plan["plan"]:
+                click.echo(
+                    "  table={table} type={type} key={key} rows={rows}".format(
+                        table=row.get("table"),
+                        type=row.get("type"),
+                        key=row.get("key"),
+                        rows=row.get("rows")
+                    )
+                )
+
+            if plan["full_scan"]:
+                click.secho("  full table scan", fg="yellow")
+    finally:
+        frappe.destroy()
+
+
+@click.command("gantt-create-load-test-data")
+@click.option("--tasks", default=2000, help="Number of tasks to create")
+@click.option("--dependency-ratio", default=0.5, help="Share of tasks that depend on an earlier task")
+@pass_context
+def gantt_create_load_test_data(context, tasks=2000, dependency_ratio=0.5):
+    """Create a synthetic project for load_test.py"""
+    import random
+    from frappe.utils import add_days, nowdate
+    from advanced_gantt.api.schedule_import import insert_schedule
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        frappe.set_user("Administrator")
+        users = frappe.get_all("User", filters={"enabled": 1, "user_type": "System User"}, pluck="name")
+
+        project = frappe.get_doc({
+            "doctype": "Project",
+            "project_name": f"Gantt Load Test {frappe.generate_hash(length=6)}",
+            "expected_start_date": nowdate(),
+            "expected_end_date": add_days(nowdate(), 120)
+        }).insert()
+
+        records = []
+        for position in range(tasks):
+            start = random.randint(0, 60)
+            records.append({
+                "subject": f"Load Test Task {position + 1}",
+                "start": add_days(nowdate(), start),
+                "finish": add_days(nowdate(), start + random.randint(0, 10)),
+                "progress": 0,
+                "parent": None,
+                "milestone": False,
+                "depends_on": [random.randrange(position)] if position and random.random() < dependency_ratio else [],
+                "assigned_to": random.sample(users, min(len(users), 1))
+            })
+
+        insert_schedule(records, project.name, "Administrator")
+
+        click.echo(f"Created project {project.name} with {len(records)} tasks")
+    finally:
+        frappe.destroy()
+
+
+commands = [gantt_explain_queries, gantt_create_load_test_data]
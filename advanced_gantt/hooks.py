@@ -9,12 +9,16 @@ app_license = "MIT"
 # ------------------
 
 # include js, css files in header of desk.html
-app_include_css = "/assets/advanced_gantt/css/gantt_styles.css"
-app_include_js = "/assets/advanced_gantt/js/gantt_component.js"
+# app_include_css = "/assets/advanced_gantt/css/advanced_gantt.css"
+# app_include_js = "/assets/advanced_gantt/js/advanced_gantt.js"
 
 # include js, css files in header of web template
-web_include_css = "/assets/advanced_gantt/css/gantt_styles.css"
-web_include_js = "/assets/advanced_gantt/js/gantt_component.js"
+# web_include_css = "/assets/advanced_gantt/css/advanced_gantt.css"
+# web_include_js = "/assets/advanced_gantt/js/advanced_gantt.js"
+#
+# The Gantt component is not included globally: www/gantt.html loads it
+# directly and the Project/Task desk views load it on demand through
+# public/js/gantt_loader.js.
 
 # include custom scss in every website theme (without file extension ".scss")
 # website_theme_scss = "advanced_gantt/public/scss/website"
@@ -27,7 +31,10 @@ web_include_js = "/assets/advanced_gantt/js/gantt_component.js"
 # page_js = {"page" : "public/js/file.js"}
 
 # include js in doctype views
-# doctype_js = {"doctype" : "public/js/doctype.js"}
+doctype_js = {
+	"Project": ["public/js/gantt_loader.js", "public/js/project.js"],
+	"Task": ["public/js/gantt_loader.js", "public/js/task.js"]
+}
 # doctype_list_js = {"doctype" : "public/js/doctype_list.js"}
 # doctype_tree_js = {"doctype" : "public/js/doctype_tree.js"}
 # doctype_calendar_js = {"doctype" : "public/js/doctype_calendar.js"}
@@ -116,13 +123,12 @@ web_include_js = "/assets/advanced_gantt/js/gantt_component.js"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Holiday List": {
+		"on_update": "advanced_gantt.api.working_calendar.clear_calendar_cache",
+		"on_trash": "advanced_gantt.api.working_calendar.clear_calendar_cache"
+	}
+}
 
 # Scheduled Tasks
 # ---------------
@@ -0,0 +1,28 @@
+import frappe
+
+
+# Composite indexes matching the filters used by advanced_gantt.api.gantt_data
+GANTT_QUERY_INDEXES = [
+    # get_tasks_data: project + exp_start_date range
+    ("Task", "gantt_project_start_index", ["project", "exp_start_date"]),
+    # get_dependencies_data: Task Depends On filtered by task
+    ("Task Depends On", "gantt_task_index", ["task"]),
+    # create_task_dependency: existence check on (parent, depends_on_task)
+    ("Task Depends On", "gantt_parent_depends_on_index", ["parent", "depends_on_task"]),
+    # get_assignments_data: Task Assigned To filtered by parent
+    ("Task Assigned To", "gantt_parent_assigned_to_index", ["parent", "assigned_to"]),
+    # get_latest_baseline / get_task_baselines: baselines of a project by creation
+    ("Gantt Baseline", "gantt_project_creation_index", ["project", "creation"])
+]
+
+
+def execute():
+    for doctype, index_name, fields in GANTT_QUERY_INDEXES:
+        if not frappe.db.table_exists(doctype):
+            continue
+
+        # Some of these columns only exist on customized Task child tables
+        if not all(frappe.db.has_column(doctype, field) for field in fields):
+            continue
+
+        frappe.db.add_index(doctype, fields, index_name=index_name)
@@ -3,28 +3,319 @@
  * Integrates Bryntum Gantt with ERPNext Project and Task data
  */
 
+/**
+ * Persistent IndexedDB cache of the last loaded Gantt dataset per
+ * user/project/date range. Entries are stored as JSON strings so their size
+ * is known up front, and the least recently used ones are evicted once the
+ * store exceeds maxEntries or maxBytes. Bumping SCHEMA_VERSION drops every
+ * cached entry on the next open.
+ */
+class GanttDataCache {
+    static get SCHEMA_VERSION() { return 1; }
+    
+    constructor(options = {}) {
+        this.dbName = options.dbName || 'advanced_gantt';
+        this.storeName = 'gantt_data';
+        this.maxEntries = options.maxEntries || 20;
+        this.maxBytes = options.maxBytes || 50 * 1024 * 1024;
+        this.dbPromise = null;
+    }
+    
+    static makeKey(project, startDate, endDate, withBaselines = false) {
+        const user = (frappe.session && frappe.session.user) || 'Guest';
+        return [user, project || '*', startDate || '', endDate || '', withBaselines ? 'baselines' : ''].join('|');
+    }
+    
+    open() {
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve, reject) => {
+                if (typeof indexedDB === 'undefined') {
+                    reject(new Error('IndexedDB is not available'));
+                    return;
+                }
+                
+                const request = indexedDB.open(this.dbName, GanttDataCache.SCHEMA_VERSION);
+                
+                request.onupgradeneeded = () => {
+                    // Cached payloads from older schema versions are not migrated
+                    const db = request.result;
+                    if (db.objectStoreNames.contains(this.storeName)) {
+                        db.deleteObjectStore(this.storeName);
+                    }
+                    const store = db.createObjectStore(this.storeName, { keyPath: 'key' });
+                    store.createIndex('lastAccessed', 'lastAccessed');
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+                request.onblocked = () => reject(new Error('IndexedDB upgrade blocked'));
+            });
+        }
+        return this.dbPromise;
+    }
+    
+    async transaction(mode, callback) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(this.storeName, mode);
+            const store = tx.objectStore(this.storeName);
+            let result;
+            
+            callback(store, value => { result = value; });
+            
+            tx.oncomplete = () => resolve(result);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+    
+    async get(key) {
+        const entry = await this.transaction('readwrite', (store, setResult) => {
+            const request = store.get(key);
+            request.onsuccess = () => {
+                const entry = request.result;
+                if (entry) {
+                    entry.lastAccessed = Date.now();
+                    store.put(entry);
+                }
+                setResult(entry);
+            };
+        });
+        
+        return entry ? entry.payload : null;
+    }
+    
+    async set(key, payload) {
+        await this.transaction('readwrite', store => {
+            store.put({
+                key: key,
+                payload: payload,
+                size: payload.length,
+                lastAccessed: Date.now()
+            });
+        });
+        
+        await this.evict();
+    }
+    
+    async evict() {
+        await this.transaction('readwrite', store => {
+            const entries = [];
+            const cursorRequest = store.index('lastAccessed').openCursor(null, 'prev');
+            
+            cursorRequest.onsuccess = () => {
+                const cursor = cursorRequest.result;
+                if (cursor) {
+                    entries.push({ key: cursor.value.key, size: cursor.value.size || 0 });
+                    cursor.continue();
+                    return;
+                }
+                
+                // Keep the most recently used entries that fit within the limits
+                let totalBytes = 0;
+                entries.forEach((entry, index) => {
+                    totalBytes += entry.size;
+                    if (index >= this.maxEntries || totalBytes > this.maxBytes) {
+                        store.delete(entry.key);
+                    }
+                });
+            };
+        });
+    }
+}
+
+/**
+ * Windowed task grid for the non-Bryntum fallback view.
+ * Only the rows inside the viewport (plus a small overscan) exist in the DOM;
+ * they are positioned absolutely and recycled as the grid scrolls.
+ */
+class VirtualTaskGrid {
+    static get ROW_HEIGHT() { return 36; }
+    static get OVERSCAN() { return 8; }
+    
+    constructor(element, tasks = []) {
+        this.element = element;
+        this.tasks = tasks;
+        this.rowHeight = VirtualTaskGrid.ROW_HEIGHT;
+        this.pool = [];
+        this.frame = null;
+        
+        this.element.innerHTML = `
+            <div class="gantt-grid-header gantt-grid-row">
+                <div>Task Name</div>
+                <div>Start Date</div>
+                <div>End Date</div>
+                <div>Progress</div>
+                <div>Assigned To</div>
+            </div>
+            <div class="gantt-grid-body"></div>
+        `;
+        this.body = this.element.querySelector('.gantt-grid-body');
+        
+        this.onScroll = this.scheduleRender.bind(this);
+        this.element.addEventListener('scroll', this.onScroll, { passive: true });
+        
+        if (typeof ResizeObserver !== 'undefined') {
+            this.resizeObserver = new ResizeObserver(this.onScroll);
+            this.resizeObserver.observe(this.element);
+        } else {
+            window.addEventListener('resize', this.onScroll);
+        }
+        
+        this.setTasks(tasks);
+    }
+    
+    setTasks(tasks) {
+        this.tasks = tasks || [];
+        this.body.style.height = `${Math.max(this.tasks.length, 1) * this.rowHeight}px`;
+        this.pool.forEach(row => { row.dataset.index = ''; });
+        
+        if (!this.tasks.length) {
+            this.body.innerHTML = '<div class="gantt-grid-empty">No tasks found</div>';
+            this.pool = [];
+            return;
+        }
+        
+        const empty = this.body.querySelector('.gantt-grid-empty');
+        if (empty) empty.remove();
+        
+        this.render();
+    }
+    
+    scheduleRender() {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    }
+    
+    render() {
+        if (!this.tasks.length) return;
+        
+        const viewportHeight = this.element.clientHeight || 600;
+        const visibleCount = Math.ceil(viewportHeight / this.rowHeight) + VirtualTaskGrid.OVERSCAN * 2;
+        const poolSize = Math.min(visibleCount, this.tasks.length);
+        
+        while (this.pool.length < poolSize) {
+            const row = this.createRow();
+            this.pool.push(row);
+            this.body.appendChild(row);
+        }
+        while (this.pool.length > poolSize) {
+            this.pool.pop().remove();
+        }
+        
+        const maxStart = this.tasks.length - poolSize;
+        const firstVisible = Math.floor(this.element.scrollTop / this.rowHeight);
+        const start = Math.max(0, Math.min(firstVisible - VirtualTaskGrid.OVERSCAN, maxStart));
+        
+        // Each row keeps a fixed slot (index modulo pool size), so rows that
+        // stay in view are not touched and only the ones scrolled out are refilled
+        for (let index = start; index < start + poolSize; index++) {
+            const row = this.pool[index % poolSize];
+            if (row.dataset.index !== String(index)) {
+                this.fillRow(row, this.tasks[index], index);
+            }
+        }
+    }
+    
+    createRow() {
+        const row = document.createElement('div');
+        row.className = 'gantt-grid-row';
+        row.style.height = `${this.rowHeight}px`;
+        row.innerHTML = `
+            <div class="gantt-grid-cell"></div>
+            <div class="gantt-grid-cell"></div>
+            <div class="gantt-grid-cell"></div>
+            <div class="gantt-grid-cell">
+                <div class="progress" style="height: 20px;">
+                    <div class="progress-bar" role="progressbar" aria-valuemin="0" aria-valuemax="100"></div>
+                </div>
+            </div>
+            <div class="gantt-grid-cell"></div>
+        `;
+        return row;
+    }
+    
+    fillRow(row, task, index) {
+        const cells = row.children;
+        const percentDone = task.percentDone || 0;
+        const progressBar = cells[3].querySelector('.progress-bar');
+        
+        row.dataset.index = String(index);
+        row.style.transform = `translateY(${index * this.rowHeight}px)`;
+        
+        cells[0].textContent = task.name || '';
+        cells[1].textContent = task.startDate || '';
+        cells[2].textContent = task.endDate || '';
+        cells[4].textContent = task.assignedTo || '';
+        
+        progressBar.style.width = `${percentDone}%`;
+        progressBar.setAttribute('aria-valuenow', percentDone);
+        progressBar.textContent = `${percentDone}%`;
+    }
+    
+    destroy() {
+        if (this.frame) cancelAnimationFrame(this.frame);
+        if (this.resizeObserver) {
+            this.resizeObserver.disconnect();
+        } else {
+            window.removeEventListener('resize', this.onScroll);
+        }
+        this.element.removeEventListener('scroll', this.onScroll);
+    }
+}
+
 class AdvancedGanttChart {
     constructor(options = {}) {
         this.container = options.container || '#gantt-container';
         this.project = options.project || null;
         this.startDate = options.startDate || null;
         this.endDate = options.endDate || null;
+        this.showBaselines = options.showBaselines || false;
         this.gantt = null;
         this.data = null;
+        this.grid = null;
+        this.dataSignature = null;
+        this.destroyed = false;
+        this.cache = options.cache === false ? null : (options.cache || new GanttDataCache());
+        this.cacheKey = GanttDataCache.makeKey(this.project, this.startDate, this.endDate, this.showBaselines);
         
         this.init();
     }
     
     async init() {
         try {
-            // Load Bryntum Gantt resources
-            await this.loadBryntumResources();
+            // Load Bryntum Gantt resources while the data is read; a failed
+            // download leaves the chart on the fallback grid
+            const resourcesLoaded = this.loadBryntumResources().then(() => true, error => {
+                console.warn('Bryntum Gantt unavailable, using the fallback grid:', error);
+                return false;
+            });
             
-            // Fetch data from ERPNext
-            await this.fetchGanttData();
+            const cached = await this.loadCachedData();
+            let dataLoaded;
             
-            // Initialize Bryntum Gantt
-            this.initializeBryntumGantt();
+            if (cached) {
+                // Paint the last known dataset without waiting for the bundle,
+                // then reconcile with the server in the background
+                if (!this.destroyed) this.createPlaceholderUI();
+                this.reconcileWithServer();
+                dataLoaded = Promise.resolve();
+            } else {
+                // Fetch data from ERPNext
+                dataLoaded = this.fetchGanttData();
+            }
+            
+            const [bryntumReady] = await Promise.all([resourcesLoaded, dataLoaded]);
+            if (this.destroyed) return;
+            
+            if (bryntumReady) {
+                // Initialize Bryntum Gantt, replacing the fallback grid
+                this.initializeBryntumGantt();
+            } else if (!cached) {
+                this.createPlaceholderUI();
+            }
             
         } catch (error) {
             console.error('Error initializing Gantt chart:', error);
@@ -32,28 +323,88 @@ class AdvancedGanttChart {
         }
     }
     
+    async loadCachedData() {
+        if (!this.cache) return false;
+        
+        try {
+            const payload = await this.cache.get(this.cacheKey);
+            if (!payload) return false;
+            
+            this.data = JSON.parse(payload);
+            this.dataSignature = payload;
+            return true;
+            
+        } catch (error) {
+            console.warn('Gantt data cache unavailable:', error);
+            return false;
+        }
+    }
+    
+    storeCachedData(payload) {
+        if (!this.cache) return;
+        
+        this.cache.set(this.cacheKey, payload).catch(error => {
+            console.warn('Error writing Gantt data cache:', error);
+        });
+    }
+    
+    async reconcileWithServer() {
+        const cachedSignature = this.dataSignature;
+        
+        try {
+            await this.fetchGanttData();
+        } catch (error) {
+            console.warn('Error reconciling cached Gantt data:', error);
+            return;
+        }
+        
+        if (!this.destroyed && this.dataSignature !== cachedSignature) {
+            this.renderData();
+        }
+    }
+    
     async loadBryntumResources() {
         // Note: In a real implementation, you would need to include Bryntum Gantt files
         // This is a placeholder for the Bryntum Gantt library loading
         
-        if (typeof bryntum === 'undefined') {
-            // Load Bryntum CSS
-            const cssLink = document.createElement('link');
-            cssLink.rel = 'stylesheet';
-            cssLink.href = '/assets/advanced_gantt/css/bryntum-gantt.css';
-            document.head.appendChild(cssLink);
-            
-            // Load Bryntum JS
-            const script = document.createElement('script');
-            script.src = '/assets/advanced_gantt/js/bryntum-gantt.js';
-            document.head.appendChild(script);
-            
-            // Wait for script to load
-            await new Promise((resolve, reject) => {
-                script.onload = resolve;
-                script.onerror = reject;
+        return AdvancedGanttChart.loadBryntum();
+    }
+    
+    static loadBryntum() {
+        // Shared by every chart instance so the bundle is requested only once
+        if (typeof bryntum !== 'undefined') {
+            return Promise.resolve();
+        }
+        
+        if (!AdvancedGanttChart.bryntumLoader) {
+            AdvancedGanttChart.bryntumLoader = Promise.all([
+                AdvancedGanttChart.loadAsset('link', '/assets/advanced_gantt/css/bryntum-gantt.css'),
+                AdvancedGanttChart.loadAsset('script', '/assets/advanced_gantt/js/bryntum-gantt.js')
+            ]).catch(error => {
+                // Allow a later chart to retry after a failed download
+                AdvancedGanttChart.bryntumLoader = null;
+                throw error;
             });
         }
+        
+        return AdvancedGanttChart.bryntumLoader;
+    }
+    
+    static loadAsset(tagName, url) {
+        return new Promise((resolve, reject) => {
+            const element = document.createElement(tagName);
+            
+            if (tagName === 'link') {
+                element.rel = 'stylesheet';
+                element.href = url;
+            } else {
+                element.src = url;
+            }
+            
+            element.onload = resolve;
+            element.onerror = () => reject(new Error(`Failed to load ${url}`));
+            document.head.appendChild(element);
+        });
     }
     
     async fetchGanttData() {
@@ -63,11 +414,14 @@ class AdvancedGanttChart {
                 args: {
                     project: this.project,
                     start_date: this.startDate,
-                    end_date: this.endDate
+                    end_date: this.endDate,
+                    include_baselines: this.showBaselines ? 1 : 0
                 }
             });
             
             this.data = response.message;
+            this.dataSignature = JSON.stringify(this.data);
+            this.storeCachedData(this.dataSignature);
             
         } catch (error) {
             console.error('Error fetching Gantt data:', error);
@@ -87,7 +441,8 @@ class AdvancedGanttChart {
                 tasks: this.data.tasks,
                 dependencies: this.data.dependencies,
                 resources: this.data.resources,
-                assignments: this.data.assignments
+                assignments: this.data.assignments,
+                calendars: this.data.calendars || []
             },
             
             // UI Configuration
@@ -117,6 +472,7 @@ class AdvancedGanttChart {
                 sort: true,
                 columnLines: true,
                 timeRanges: true,
+                baselines: this.showBaselines,
                 labels: {
                     left: {
                         field: 'name'
@@ -151,6 +507,11 @@ class AdvancedGanttChart {
         const container = document.querySelector(this.container);
         if (!container) return;
         
+        if (this.grid) {
+            this.grid.destroy();
+            this.grid = null;
+        }
+        
         container.innerHTML = `
             <div class="gantt-placeholder">
                 <div class="gantt-header">
@@ -165,22 +526,7 @@ class AdvancedGanttChart {
                     </div>
                 </div>
                 <div class="gantt-content">
-                    <div class="gantt-grid">
-                        <table class="table table-bordered">
-                            <thead>
-                                <tr>
-                                    <th>Task Name</th>
-                                    <th>Start Date</th>
-                                    <th>End Date</th>
-                                    <th>Progress</th>
-                                    <th>Assigned To</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                ${this.renderTaskRows()}
-                            </tbody>
-                        </table>
-                    </div>
+                    <div class="gantt-grid"></div>
                     <div class="gantt-timeline">
                         <div class="timeline-placeholder">
                             <p><strong>Bryntum Gantt Timeline</strong></p>
@@ -191,53 +537,66 @@ class AdvancedGanttChart {
                                 <li>Include the Bryntum Gantt library files</li>
                                 <li>Replace the placeholder code with actual Bryntum initialization</li>
                             </ol>
-                            <div class="data-preview">
-                                <h5>Data Preview:</h5>
-                                <pre>${JSON.stringify(this.data, null, 2)}</pre>
-                            </div>
+                            <details class="data-preview">
+                                <summary>Data Preview</summary>
+                                <pre></pre>
+                            </details>
                         </div>
                     </div>
                 </div>
             </div>
         `;
+        
+        const tasks = (this.data && this.data.tasks) || [];
+        this.grid = new VirtualTaskGrid(container.querySelector('.gantt-grid'), tasks);
+        this.bindDataPreview(container.querySelector('.data-preview'));
     }
     
-    renderTaskRows() {
-        if (!this.data || !this.data.tasks) return '<tr><td colspan="5">No tasks found</td></tr>';
-        
-        return this.data.tasks.map(task => `
-            <tr>
-                <td>${task.name || ''}</td>
-                <td>${task.startDate || ''}</td>
-                <td>${task.endDate || ''}</td>
-                <td>
-                    <div class="progress" style="height: 20px;">
-                        <div class="progress-bar" role="progressbar" 
-                             style="width: ${task.percentDone || 0}%"
-                             aria-valuenow="${task.percentDone || 0}" 
-                             aria-valuemin="0" aria-valuemax="100">
-                            ${task.percentDone || 0}%
-                        </div>
-                    </div>
-                </td>
-                <td>${task.assignedTo || ''}</td>
-            </tr>
-        `).join('');
+    bindDataPreview(preview) {
+        // Serializing the whole dataset is expensive, so only do it when opened
+        const data = this.data;
+        const pre = preview.querySelector('pre');
+        let rendered = false;
+        
+        preview.addEventListener('toggle', () => {
+            if (!preview.open || rendered) return;
+            rendered = true;
+            
+            const text = JSON.stringify(data, null, 2) || '';
+            if (text.length > AdvancedGanttChart.PREVIEW_LIMIT) {
+                pre.textContent = text.slice(0, AdvancedGanttChart.PREVIEW_LIMIT) +
+                    '\n... (truncated, use Export for the full data)';
+            } else {
+                pre.textContent = text;
+            }
+        });
     }
     
     // Event handlers for Bryntum Gantt interactions
     async onTaskDrop(event) {
         const { task } = event;
         try {
-            await frappe.call({
+            const response = await frappe.call({
                 method: 'advanced_gantt.api.gantt_data.update_task_dates',
                 args: {
                     task_id: task.id,
                     start_date: task.startDate,
-                    end_date: task.endDate
+                    end_date: task.endDate,
+                    keep_working_duration: 1
                 }
             });
             
+            // The server snaps moved tasks onto working days. Parse its
+            // YYYY-MM-DD dates as local dates: new Date() would read them as
+            // UTC midnight and show them a day early west of UTC
+            const { start_date, end_date } = response.message || {};
+            if (start_date && end_date) {
+                task.setStartEndDate(
+                    frappe.datetime.str_to_obj(start_date),
+                    frappe.datetime.str_to_obj(end_date)
+                );
+            }
+            
             frappe.show_alert({
                 message: __('Task dates updated successfully'),
                 indicator: 'green'
@@ -318,14 +677,18 @@ class AdvancedGanttChart {
     }
     
     // Utility methods
+    renderData() {
+        if (this.gantt) {
+            this.gantt.project.loadInlineData(this.data);
+        } else {
+            this.createPlaceholderUI();
+        }
+    }
+    
     async refreshData() {
         try {
             await this.fetchGanttData();
-            if (this.gantt) {
-                this.gantt.project.loadInlineData(this.data);
-            } else {
-                this.createPlaceholderUI();
-            }
+            this.renderData();
             
             frappe.show_alert({
                 message: __('Gantt data refreshed successfully'),
@@ -360,11 +723,23 @@ class AdvancedGanttChart {
     }
     
     destroy() {
+        this.destroyed = true;
+        if (this.grid) {
+            this.grid.destroy();
+            this.grid = null;
+        }
         if (this.gantt) {
             this.gantt.destroy();
         }
     }
 }
 
+AdvancedGanttChart.bryntumLoader = null;
+
+// Maximum number of characters shown in the raw data preview
+AdvancedGanttChart.PREVIEW_LIMIT = 500000;
+
 // Global reference for easy access
-window.AdvancedGanttChart = AdvancedGanttChart;
\ No newline at end of file
+window.AdvancedGanttChart = AdvancedGanttChart;
+window.GanttDataCache = GanttDataCache;
+window.VirtualTaskGrid = VirtualTaskGrid;
\ No newline at end of file
@@ -0,0 +1,73 @@
+/**
+ * On-demand loader for the Advanced Gantt component in desk views
+ * The component and Bryntum bundles are only fetched when a chart is opened
+ */
+
+frappe.provide('advanced_gantt');
+
+advanced_gantt.component_assets = [
+    '/assets/advanced_gantt/css/gantt_styles.css',
+    '/assets/advanced_gantt/js/gantt_component.js'
+];
+
+advanced_gantt.preload_assets = [
+    { href: '/assets/advanced_gantt/js/gantt_component.js', as: 'script' },
+    { href: '/assets/advanced_gantt/js/bryntum-gantt.js', as: 'script' },
+    { href: '/assets/advanced_gantt/css/bryntum-gantt.css', as: 'style' }
+];
+
+advanced_gantt.preload_component = function() {
+    // Hint the browser to fetch the bundles in the background
+    advanced_gantt.preload_assets.forEach(asset => {
+        if (document.querySelector(`link[rel="preload"][href="${asset.href}"]`)) return;
+        
+        const link = document.createElement('link');
+        link.rel = 'preload';
+        link.href = asset.href;
+        link.as = asset.as;
+        document.head.appendChild(link);
+    });
+};
+
+advanced_gantt.load_component = function() {
+    if (!advanced_gantt.component_loaded) {
+        advanced_gantt.component_loaded = new Promise(resolve => {
+            frappe.require(advanced_gantt.component_assets, resolve);
+        });
+    }
+    return advanced_gantt.component_loaded;
+};
+
+advanced_gantt.open_chart = function(project) {
+    const dialog = new frappe.ui.Dialog({
+        title: __('Gantt Chart'),
+        size: 'extra-large'
+    });
+    
+    // Hidden dialogs stay in the DOM, so every chart gets its own container
+    const container_id = `advanced-gantt-dialog-${frappe.utils.get_random(8)}`;
+    let chart = null;
+    
+    dialog.$body.html(`
+        <div id="${container_id}" style="height: 600px;">
+            <div class="gantt-loading">${__('Loading Gantt chart...')}</div>
+        </div>
+    `);
+    dialog.onhide = () => {
+        if (chart) chart.destroy();
+        dialog.$wrapper.remove();
+    };
+    dialog.show();
+    
+    advanced_gantt.load_component().then(() => {
+        if (!document.getElementById(container_id)) return;
+        
+        chart = new AdvancedGanttChart({
+            container: `#${container_id}`,
+            project: project || null
+        });
+        
+        // Placeholder UI buttons call the global ganttChart
+        window.ganttChart = chart;
+    });
+};
@@ -0,0 +1,10 @@
+frappe.ui.form.on('Project', {
+    refresh(frm) {
+        if (frm.is_new()) return;
+        
+        advanced_gantt.preload_component();
+        frm.add_custom_button(__('Gantt Chart'), () => {
+            advanced_gantt.open_chart(frm.doc.name);
+        }, __('View'));
+    }
+});
@@ -0,0 +1,10 @@
+frappe.ui.form.on('Task', {
+    refresh(frm) {
+        if (frm.is_new() || !frm.doc.project) return;
+        
+        advanced_gantt.preload_component();
+        frm.add_custom_button(__('Gantt Chart'), () => {
+            advanced_gantt.open_chart(frm.doc.project);
+        }, __('View'));
+    }
+});
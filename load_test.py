@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Concurrent load and contention test for the Advanced Gantt write endpoints
+Drives get_gantt_data, update_task_dates, update_task_progress and
+create_task_dependency from many simulated planners against a local bench
+
+Usage:
+    bench --site your-site-name gantt-create-load-test-data --tasks 2000
+    python load_test.py --url http://localhost:8000 --project PROJ-0001 \\
+        --user Administrator --password admin --clients 50 --duration 60
+"""
+
+import argparse
+import http.cookiejar
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+
+API_PREFIX = "/api/method/advanced_gantt.api"
+
+ENDPOINTS = {
+    "get_gantt_data": f"{API_PREFIX}.gantt_data.get_gantt_data",
+    "update_task_dates": f"{API_PREFIX}.gantt_data.update_task_dates",
+    "update_task_progress": f"{API_PREFIX}.gantt_data.update_task_progress",
+    "create_task_dependency": f"{API_PREFIX}.gantt_data.create_task_dependency"
+}
+
+DEFAULT_MIX = "update_task_dates=4,update_task_progress=3,create_task_dependency=1,get_gantt_data=2"
+
+# Frappe exception types, and the MariaDB errors kept in the messages of
+# endpoints that re-throw them, e.g. "(1213, 'Deadlock found when ...')"
+DEADLOCK_EXC_TYPES = ("QueryDeadlockError",)
+LOCK_WAIT_EXC_TYPES = ("QueryTimeoutError",)
+DEADLOCK_MARKERS = ("(1213,", "Deadlock found when trying to get lock")
+LOCK_WAIT_MARKERS = ("(1205,", "Lock wait timeout exceeded")
+
+
+class GanttClient:
+    """One simulated planner with its own session"""
+
+    def __init__(self, url, user=None, password=None, api_key=None, api_secret=None, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Accept": "application/json"}
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+        if api_key and api_secret:
+            self.headers["Authorization"] = f"token {api_key}:{api_secret}"
+        elif user and password:
+            self.post("/api/method/login", {"usr": user, "pwd": password})
+
+    def post(self, path, data):
+        body = urllib.parse.urlencode(
+            {key: value for key, value in data.items() if value is not None}
+        ).encode()
+        request = urllib.request.Request(self.url + path, data=body, headers=self.headers)
+
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode(errors="replace")
+
+    def call(self, endpoint, **args):
+        return self.post(ENDPOINTS[endpoint], args)
+
+
+def classify_error(body):
+    """Return 'deadlock', 'lock_wait' or 'error' for a failed response"""
+    exc_type, messages = parse_error(body)
+
+    if exc_type in DEADLOCK_EXC_TYPES or any(marker in messages for marker in DEADLOCK_MARKERS):
+        return "deadlock"
+    if exc_type in LOCK_WAIT_EXC_TYPES or any(marker in messages for marker in LOCK_WAIT_MARKERS):
+        return "lock_wait"
+    return "error"
+
+
+def parse_error(body):
+    """
+    exc_type and error text of a Frappe error response; only the exception
+    and messages are searched, not task names echoed elsewhere in the body
+    """
+    try:
+        response = json.loads(body)
+    except ValueError:
+        # Not a Frappe response, e.g. a proxy error page or a client exception
+        return None, body
+
+    if not isinstance(response, dict):
+        return None, ""
+
+    messages = [str(response.get("exception") or "")]
+    try:
+        for message in json.loads(response.get("_server_messages") or "[]"):
+            try:
+                message = json.loads(message).get("message", message)
+            except (ValueError, AttributeError):
+                pass
+            messages.append(str(message))
+    except ValueError:
+        messages.append(str(response["_server_messages"]))
+
+    return response.get("exc_type"), "\n".join(messages)
+
+
+def parse_mix(mix):
+    """Parse 'endpoint=weight,...' into parallel lists for random.choices"""
+    endpoints, weights = [], []
+    for item in mix.split(","):
+        endpoint, _sep, weight = item.partition("=")
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+        endpoints.append(endpoint)
+        weights.append(float(weight or 1))
+    return endpoints, weights
+
+
+def build_request(endpoint, args, hot_tasks, rng):
+    """Random arguments for one request, concentrated on the shared hot tasks"""
+    if endpoint == "get_gantt_data":
+        return {"project": args.project, "start_date": args.start_date, "end_date": args.end_date}
+
+    task_id = rng.choice(hot_tasks)
+
+    if endpoint == "update_task_dates":
+        start = date.today() + timedelta(days=rng.randint(0, 60))
+        return {
+            "task_id": task_id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.randint(0, 10))).isoformat()
+        }
+
+    if endpoint == "update_task_progress":
+        return {"task_id": task_id, "progress": rng.randint(0, 100)}
+
+    from_task = rng.choice(hot_tasks)
+    while from_task == task_id and len(hot_tasks) > 1:
+        from_task = rng.choice(hot_tasks)
+    return {"from_task": from_task, "to_task": task_id}
+
+
+def run_client(client_id, args, hot_tasks, endpoints, weights, deadline, results, lock):
+    """Issue requests until the deadline and record latency and outcome per endpoint"""
+    rng = random.Random(args.seed + client_id)
+    client = GanttClient(args.url, args.user, args.password, args.api_key, args.api_secret)
+    local = defaultdict(lambda: {"latencies": [], "ok": 0, "error": 0, "lock_wait": 0, "deadlock": 0})
+
+    while time.monotonic() < deadline:
+        endpoint = rng.choices(endpoints, weights)[0]
+        request_args = build_request(endpoint, args, hot_tasks, rng)
+
+        started = time.perf_counter()
+        try:
+            status, body = client.call(endpoint, **request_args)
+            outcome = "ok" if status == 200 else classify_error(body)
+        except Exception as e:
+            outcome = classify_error(str(e))
+        elapsed = time.perf_counter() - started
+
+        local[endpoint]["latencies"].append(elapsed)
+        local[endpoint][outcome] += 1
+
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+
+    with lock:
+        for endpoint, stats in local.items():
+            merged = results[endpoint]
+            merged["latencies"].extend(stats["latencies"])
+            for key in ("ok", "error", "lock_wait", "deadlock"):
+                merged[key] += stats[key]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(results, elapsed):
+    """Latency percentiles (ms), throughput and error counts per endpoint"""
+    summary = {}
+    for endpoint, stats in sorted(results.items()):
+        latencies = sorted(stats["latencies"])
+        summary[endpoint] = {
+            "requests": len(latencies),
+            "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round((latencies[-1] if latencies else 0) * 1000, 1),
+            "ok": stats["ok"],
+            "errors": stats["error"],
+            "lock_waits": stats["lock_wait"],
+            "deadlocks": stats["deadlock"]
+        }
+    return summary
+
+
+def get_lock_statistics(client):
+    """Server-wide InnoDB lock counters (requires a System Manager login)"""
+    status, body = client.post(f"{API_PREFIX}.diagnostics.get_lock_statistics", {})
+    if status != 200:
+        return None
+    return json.loads(body).get("message")
+
+
+def get_project_tasks(client, args):
+    status, body = client.call(
+        "get_gantt_data", project=args.project, start_date=args.start_date, end_date=args.end_date
+    )
+    if status != 200:
+        raise RuntimeError(f"Could not load tasks of {args.project}: {body[:500]}")
+
+    tasks = json.loads(body)["message"]["tasks"]
+    return [task["id"] for task in tasks if not str(task["id"]).startswith("project_")]
+
+
+def print_summary(summary, lock_delta):
+    header = f"{'endpoint':<24}{'reqs':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'errors':>8}{'lockwait':>10}{'deadlock':>10}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, stats in summary.items():
+        print(
+            f"{endpoint:<24}{stats['requests']:>8}{stats['throughput']:>9}"
+            f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['max_ms']:>9}"
+            f"{stats['errors']:>8}{stats['lock_waits']:>10}{stats['deadlocks']:>10}"
+        )
+    print("(latencies in ms)")
+
+    if lock_delta:
+        print("\nServer InnoDB counters during the run:")
+        for name, value in lock_delta.items():
+            print(f"  {name}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Advanced Gantt concurrent load test")
+    parser.add_argument("--url", default="http://localhost:8000", help="Bench site URL")
+    parser.add_argument("--project", required=True, help="Project created by gantt-create-load-test-data")
+    parser.add_argument("--user", default="Administrator")
+    parser.add_argument("--password")
+    parser.add_argument("--api-key")
+    parser.add_argument("--api-secret")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent simulated planners")
+    parser.add_argument("--duration", type=float, default=30, help="Test duration in seconds")
+    parser.add_argument("--hot-tasks", type=int, default=50, help="Tasks all clients compete for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--think-time", type=float, default=0, help="Max random pause between requests (s)")
+    parser.add_argument("--start-date", default=(date.today() - timedelta(days=30)).isoformat())
+    parser.add_argument("--end-date", default=(date.today() + timedelta(days=120)).isoformat())
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.password and not (args.api_key and args.api_secret):
+        parser.error("Pass --password or --api-key and --api-secret")
+
+    endpoints, weights = parse_mix(args.mix)
+
+    admin = GanttClient(args.url, args.user, args.password, args.api_key, args.api_secret)
+    task_ids = get_project_tasks(admin, args)
+    if not task_ids:
+        print(f"No tasks found in {args.project}")
+        return False
+
+    hot_tasks = random.Random(args.seed).sample(task_ids, min(args.hot_tasks, len(task_ids)))
+    lock_before = get_lock_statistics(admin)
+
+    print(f"Running {args.clients} clients for {args.duration}s on {len(hot_tasks)} hot tasks of {args.project}")
+
+    results = defaultdict(lambda: {"latencies": [], "ok": 0, "error": 0, "lock_wait": 0, "deadlock": 0})
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(client_id, args, hot_tasks, endpoints, weights, deadline, results, lock)
+        )
+        for client_id in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    summary = summarize(results, elapsed)
+
+    lock_after = get_lock_statistics(admin)
+    lock_delta = None
+    if lock_before and lock_after:
+        lock_delta = {name: lock_after[name] - lock_before.get(name, 0) for name in lock_after}
+
+    print_summary(summary, lock_delta)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "clients": args.clients,
+                "duration": round(elapsed, 2),
+                "hot_tasks": len(hot_tasks),
+                "mix": args.mix,
+                "endpoints": summary,
+                "server_lock_counters": lock_delta
+            }, f, indent=2)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -7,9 +7,13 @@ This script tests the API functionality without requiring a full Frappe installa
 import json
 import sys
 import os
+import tempfile
 
 # Add the app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'advanced_gantt'))
+# Keep the app package ahead of its module folder of the same name so the
+# absolute advanced_gantt.api imports between the API modules resolve
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 def test_data_transformation():
     """Test the data transformation functions"""
@@ -121,6 +125,326 @@ def test_data_transformation():
         print(f"✗ Transformation error: {e}")
         return False
 
+def test_baseline_encoding():
+    """Test baseline delta encoding and variance computation"""
+    print("Testing baseline encoding...")
+    
+    class MockTask(dict):
+        __getattr__ = dict.get
+    
+    baseline_tasks = [
+        MockTask(name='TASK-001', exp_start_date='2024-01-01', exp_end_date='2024-01-15', progress=50),
+        MockTask(name='TASK-002', exp_start_date='2024-01-16', exp_end_date='2024-01-16', progress=0),
+        MockTask(name='TASK-003', exp_start_date=None, exp_end_date=None, progress=0)
+    ]
+    
+    current_tasks = [
+        MockTask(name='TASK-001', exp_start_date='2024-01-03', exp_end_date='2024-01-18', progress=60),
+        MockTask(name='TASK-002', exp_start_date='2024-01-16', exp_end_date='2024-01-16', progress=0),
+        MockTask(name='TASK-004', exp_start_date='2024-02-01', exp_end_date='2024-02-10', progress=0)
+    ]
+    
+    try:
+        from frappe.utils import getdate
+        from api.baselines import (
+            build_task_columns,
+            diff_columns,
+            apply_delta,
+            compute_variance,
+            encode_snapshot,
+            decode_snapshot
+        )
+        
+        epoch = getdate('2024-01-01')
+        previous = build_task_columns(baseline_tasks, epoch)
+        current = build_task_columns(current_tasks, epoch)
+        
+        snapshot = {"v": 1, "type": "delta", **diff_columns(previous, current)}
+        delta = decode_snapshot(encode_snapshot(snapshot))
+        if apply_delta(previous, delta) != current:
+            print("✗ Delta round trip does not reproduce the current columns")
+            return False
+        print(f"✓ Delta stores {len(delta['changed']['pos'])} changed, "
+              f"{len(delta['added']['ids'])} added and {len(delta['removed'])} removed tasks")
+        
+        variance = {row['task']: row for row in compute_variance(previous, current, epoch)}
+        if variance['TASK-001']['startVariance'] != 2 or variance['TASK-001']['finishVariance'] != 3:
+            print("✗ Unexpected variance for TASK-001")
+            return False
+        print(f"✓ Computed variance for {len(variance)} tasks")
+        
+        return True
+        
+    except ImportError as e:
+        print(f"✗ Import error: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Baseline encoding error: {e}")
+        return False
+
+def test_schedule_parsing():
+    """Test reading CSV and MS Project XML schedules"""
+    print("Testing schedule parsing...")
+    
+    csv_content = (
+        "Task ID,WBS,Task Name,Start Date,Finish,% Complete,Predecessors,Resource Names,Milestone\n"
+        "T-001,1,Design,2024-01-01,2024-01-05,50%,,user@example.com,\n"
+        "T-002,1.1,Review,2024-01-08,2024-01-08,0,T-001FS+2d; 1,,yes\n"
+    )
+    
+    msp_content = """<?xml version="1.0" encoding="UTF-8"?>
+<Project xmlns="http://schemas.microsoft.com/project">
+    <Tasks>
+        <Task><UID>0</UID><Name>Project Summary</Name></Task>
+        <Task><UID>1</UID><Name>Design</Name><WBS>1</WBS><Start>2024-01-01T08:00:00</Start><Finish>2024-01-05T17:00:00</Finish><PercentComplete>50</PercentComplete></Task>
+        <Task><UID>2</UID><Name>Review</Name><WBS>1.1</WBS><Milestone>1</Milestone>
+            <PredecessorLink><PredecessorUID>1</PredecessorUID></PredecessorLink>
+        </Task>
+    </Tasks>
+    <Resources>
+        <Resource><UID>7</UID><Name>Planner</Name><EmailAddress>user@example.com</EmailAddress></Resource>
+    </Resources>
+    <Assignments>
+        <Assignment><TaskUID>1</TaskUID><ResourceUID>7</ResourceUID></Assignment>
+    </Assignments>
+</Project>
+"""
+    
+    try:
+        from api.schedule_import import map_csv_columns, iter_csv_rows, iter_msproject_rows
+        
+        columns = map_csv_columns([" Task ID", "Task Name", "Finish Date", "Depends On"])
+        if columns != {"id": " Task ID", "subject": "Task Name", "finish": "Finish Date", "predecessors": "Depends On"}:
+            print(f"✗ Unexpected column mapping: {columns}")
+            return False
+        print("✓ Column aliases mapped to the file headers")
+        
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "schedule.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write(csv_content)
+            
+            xml_path = os.path.join(directory, "schedule.xml")
+            with open(xml_path, "w", encoding="utf-8") as f:
+                f.write(msp_content)
+            
+            csv_rows = list(iter_csv_rows(csv_path))
+            msp_rows = list(iter_msproject_rows(xml_path))
+        
+        review = csv_rows[1]
+        if (len(csv_rows) != 2 or csv_rows[0]["progress"] != 50 or csv_rows[0]["assigned_to"] != ["user@example.com"]
+                or review["key"] != "T-002" or review["predecessors"] != ["T-001FS+2d", "1"] or not review["milestone"]):
+            print(f"✗ Unexpected CSV rows: {csv_rows}")
+            return False
+        print(f"✓ Read {len(csv_rows)} CSV rows")
+        
+        if ([row["key"] for row in msp_rows] != ["1", "2"] or msp_rows[0]["assigned_to"] != ["user@example.com"]
+                or msp_rows[1]["predecessors"] != ["1"] or msp_rows[1]["wbs"] != "1.1" or not msp_rows[1]["milestone"]):
+            print(f"✗ Unexpected MS Project rows: {msp_rows}")
+            return False
+        print(f"✓ Read {len(msp_rows)} MS Project tasks without the summary task")
+        
+        return True
+        
+    except ImportError as e:
+        print(f"✗ Import error: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Schedule parsing error: {e}")
+        return False
+
+def test_schedule_resolution():
+    """Test resolving WBS parents and predecessors of an imported schedule"""
+    print("Testing schedule resolution...")
+    
+    def row(key, wbs, predecessors):
+        return {"key": key, "wbs": wbs, "subject": f"Task {key}", "predecessors": predecessors, "assigned_to": []}
+    
+    mock_rows = [
+        row("T-001", "1", []),
+        row("T-002", "1.1", ["T-001FS+2d", "T-002"]),
+        row("TASK-2024-00012", "1.2", ["1.1SS", "T-001"]),
+        row("T-004", "2", ["TASK-2024-00012", "T-999"])
+    ]
+    
+    try:
+        from api.schedule_import import resolve_schedule, assign_nested_set
+        
+        records, unresolved = resolve_schedule(mock_rows)
+        
+        if [record["parent"] for record in records] != [None, 0, 0, None] or not records[0].get("is_group"):
+            print(f"✗ Unexpected WBS parents: {[record['parent'] for record in records]}")
+            return False
+        print("✓ Parents resolved from the WBS codes")
+        
+        # By id with a lag, by WBS with a type, hyphenated ids kept whole, self references skipped
+        if [record["depends_on"] for record in records] != [[], [0], [1, 0], [2]]:
+            print(f"✗ Unexpected predecessors: {[record['depends_on'] for record in records]}")
+            return False
+        print("✓ Predecessors resolved by id and by WBS")
+        
+        if unresolved != ["T-004: T-999"]:
+            print(f"✗ Unexpected unresolved references: {unresolved}")
+            return False
+        print("✓ Unknown predecessor reported as unresolved")
+        
+        order = assign_nested_set(records, 11)
+        if [(record["lft"], record["rgt"]) for record in records] != [(11, 16), (12, 13), (14, 15), (17, 18)] or order[0] != 3:
+            print(f"✗ Unexpected nested set: {[(record['lft'], record['rgt']) for record in records]}")
+            return False
+        print("✓ Nested set appended after the existing tree")
+        
+        return True
+        
+    except ImportError as e:
+        print(f"✗ Import error: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Schedule resolution error: {e}")
+        return False
+
+def test_working_calendar():
+    """Test working day counting and date shifting"""
+    print("Testing working calendar...")
+    
+    try:
+        from frappe.utils import getdate
+        from api.working_calendar import WorkingCalendar
+        
+        # Saturday/Sunday weekends plus New Year's Day
+        calendar = WorkingCalendar('2024-01-01', '2024-01-31', holidays=['2024-01-01'])
+        
+        working_days = calendar.working_days_between('2024-01-01', '2024-01-14')
+        if working_days != 9:
+            print(f"✗ Expected 9 working days, got {working_days}")
+            return False
+        print(f"✓ Counted {working_days} working days in the first two weeks")
+        
+        shifted = calendar.add_working_days('2024-01-05', 1)
+        if shifted != getdate('2024-01-08'):
+            print(f"✗ Expected 2024-01-08, got {shifted}")
+            return False
+        print("✓ Adding a working day skips the weekend")
+        
+        # Dates outside the compiled range extend the calendar
+        shifted = calendar.add_working_days('2024-01-31', 25)
+        if shifted != getdate('2024-03-06'):
+            print(f"✗ Expected 2024-03-06, got {shifted}")
+            return False
+        print("✓ Calendar extends past its compiled range")
+        
+        intervals = calendar.non_working_intervals('2024-01-01', '2024-01-14')
+        expected = [('2024-01-01', '2024-01-01'), ('2024-01-06', '2024-01-07'), ('2024-01-13', '2024-01-14')]
+        if intervals != [(getdate(first), getdate(last)) for first, last in expected]:
+            print(f"✗ Unexpected non-working intervals: {intervals}")
+            return False
+        print("✓ Non-working days are grouped into intervals")
+        
+        # A calendar without any working day must fail instead of searching forever
+        closed = WorkingCalendar('2024-01-01', '2024-01-31', weekly_off=[
+            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
+        ])
+        try:
+            closed.add_working_days('2024-01-10', 1)
+            print("✗ Expected an error for a calendar without working days")
+            return False
+        except Exception:
+            print("✓ Calendar without working days raises an error")
+        
+        return True
+        
+    except ImportError as e:
+        print(f"✗ Import error: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Working calendar error: {e}")
+        return False
+
+def test_resource_leveling():
+    """Test that over-allocated tasks are delayed within their float"""
+    print("Testing resource leveling...")
+    
+    class MockTask(dict):
+        __getattr__ = dict.get
+    
+    mock_tasks = [
+        MockTask(name='TASK-001', exp_start_date='2024-01-01', exp_end_date='2024-01-03', priority='High', status='Open'),
+        MockTask(name='TASK-002', exp_start_date='2024-01-01', exp_end_date='2024-01-02', priority='Low', status='Open'),
+        MockTask(name='TASK-003', exp_start_date='2024-01-10', exp_end_date='2024-01-10', priority='Low', status='Open')
+    ]
+    mock_dependencies = [('TASK-003', 'TASK-002')]
+    mock_assignments = [('TASK-001', 'user@example.com'), ('TASK-002', 'user@example.com')]
+    
+    try:
+        from frappe.utils import getdate
+        from api.resource_leveling import level_schedule
+        
+        result = level_schedule(mock_tasks, mock_dependencies, mock_assignments)
+        moves = {move['task']: move for move in result['moves']}
+        
+        if list(moves) != ['TASK-002'] or moves['TASK-002']['newStart'] != getdate('2024-01-04'):
+            print(f"✗ Unexpected moves: {result['moves']}")
+            return False
+        print("✓ Lower priority task delayed after the high priority one")
+        
+        if result['unresolved']:
+            print(f"✗ Unexpected unresolved tasks: {result['unresolved']}")
+            return False
+        print("✓ All over-allocation resolved within float")
+        
+        # With a calendar, a delay into the weekend continues on Monday
+        from api.working_calendar import WorkingCalendar
+        calendar = WorkingCalendar('2024-01-01', '2024-01-31')
+        mock_tasks[0] = MockTask(mock_tasks[0], exp_end_date='2024-01-04')
+        result = level_schedule(
+            mock_tasks, mock_dependencies, mock_assignments,
+            task_calendars={task.name: calendar for task in mock_tasks}
+        )
+        moves = {move['task']: move for move in result['moves']}
+        
+        if (moves['TASK-002']['newStart'], moves['TASK-002']['newEnd']) != (getdate('2024-01-05'), getdate('2024-01-08')):
+            print(f"✗ Unexpected calendar moves: {result['moves']}")
+            return False
+        print("✓ Delayed task keeps its working days across the weekend")
+        
+        # Duplicate Task Depends On rows count as a single link
+        duplicate_tasks = [
+            MockTask(name='A', exp_start_date='2024-01-01', exp_end_date='2024-01-02', priority='Urgent', status='Open'),
+            MockTask(name='B', exp_start_date='2024-01-10', exp_end_date='2024-01-10', priority='Medium', status='Open'),
+            MockTask(name='C', exp_start_date='2024-01-01', exp_end_date='2024-01-02', priority='Low', status='Open')
+        ]
+        result = level_schedule(
+            duplicate_tasks, [('B', 'A'), ('B', 'A'), ('B', 'C')],
+            [('A', 'user@example.com'), ('C', 'user@example.com')]
+        )
+        moves = {move['task']: move for move in result['moves']}
+        
+        if list(moves) != ['C'] or moves['C']['newStart'] != getdate('2024-01-03') or result['unresolved']:
+            print(f"✗ Unexpected moves with duplicate dependencies: {result['moves']}")
+            return False
+        print("✓ Duplicate dependencies are scheduled once")
+        
+        # A summary task spanning its children neither moves nor uses capacity
+        group_tasks = [
+            MockTask(name='G', exp_start_date='2024-01-01', exp_end_date='2024-01-10', priority='Low', status='Open', is_group=1),
+            MockTask(name='X', exp_start_date='2024-01-03', exp_end_date='2024-01-04', priority='High', status='Open')
+        ]
+        result = level_schedule(group_tasks, [], [('G', 'user@example.com'), ('X', 'user@example.com')])
+        
+        if result['moves'] or result['unresolved']:
+            print(f"✗ Unexpected moves around a group task: {result}")
+            return False
+        print("✓ Group tasks keep their dates and do not use capacity")
+        
+        return True
+        
+    except ImportError as e:
+        print(f"✗ Import error: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Resource leveling error: {e}")
+        return False
+
 def test_file_structure():
     """Test that all required files exist"""
     print("\nTesting file structure...")
@@ -129,12 +453,19 @@ def test_file_structure():
         'advanced_gantt/hooks.py',
         'advanced_gantt/api/__init__.py',
         'advanced_gantt/api/gantt_data.py',
+        'advanced_gantt/api/baselines.py',
+        'advanced_gantt/api/resource_leveling.py',
+        'advanced_gantt/api/schedule_import.py',
+        'advanced_gantt/api/working_calendar.py',
         'advanced_gantt/public/js/gantt_component.js',
+        'advanced_gantt/public/js/gantt_loader.js',
         'advanced_gantt/public/css/gantt_styles.css',
         'advanced_gantt/www/gantt.py',
         'advanced_gantt/www/gantt.html',
         'advanced_gantt/advanced_gantt/doctype/gantt_chart_settings/gantt_chart_settings.json',
         'advanced_gantt/advanced_gantt/doctype/gantt_chart_settings/gantt_chart_settings.py',
+        'advanced_gantt/advanced_gantt/doctype/gantt_baseline/gantt_baseline.json',
+        'advanced_gantt/advanced_gantt/doctype/gantt_baseline/gantt_baseline.py',
         'advanced_gantt/advanced_gantt/workspace/advanced_gantt/advanced_gantt.json'
     ]
     
@@ -194,6 +525,11 @@ def main():
     tests = [
         ("File Structure", test_file_structure),
         ("Data Transformation", test_data_transformation),
+        ("Baseline Encoding", test_baseline_encoding),
+        ("Schedule Parsing", test_schedule_parsing),
+        ("Schedule Resolution", test_schedule_resolution),
+        ("Working Calendar", test_working_calendar),
+        ("Resource Leveling", test_resource_leveling),
         ("JavaScript Syntax", test_javascript_syntax)
     ]
     